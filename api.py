@@ -1,16 +1,117 @@
+import json
+
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from resume_parser import extract_text_from_pdf, extract_text_from_docx, extract_skills_from_resume
-from github_analyzer import analyze_github_profile
-from gap_engine import analyze_skill_gap
+from github_analyzer import (
+    analyze_github_profile_async,
+    github_cache_stats,
+    github_rate_limit_status,
+    github_feedback_prompt,
+    finish_github_feedback,
+)
+from gap_engine import (
+    analyze_skill_gap,
+    MATCH_MODES,
+    recommendations_prompt,
+    finish_recommendations,
+    finish_learning_roadmap,
+)
 from utils import get_skills_for_role
+from taxonomy import get_taxonomy
+from role_fit import rank_roles
+from candidate_index import get_candidate_index
+from team_analysis import analyze_team_async
+from gen_ai_engine import (
+    ollama_status,
+    llm_cache_stats,
+    stream_ollama,
+    roadmap_prompt,
+    audit_prompt,
+    finish_audit,
+    cover_letter_prompt,
+    finish_cover_letter,
+)
 
 app = FastAPI()
 
+
+@app.on_event("startup")
+def _map_embedding_index():
+    # memory-map the taxonomy embeddings if they were already built; never loads the model
+    try:
+        from semantic_matcher import load_embedding_index
+        load_embedding_index(build=False)
+    except Exception as exc:
+        print("[api] warning: embedding index not loaded:", exc)
+
+
+def _read_resume_upload(resume):
+    if not resume:
+        raise HTTPException(status_code=400, detail="Missing resume file in form-data.")
+
+    filename = (resume.filename or "").lower()
+    try:
+        if filename.endswith(".pdf"):
+            return extract_text_from_pdf(resume.file)
+        if filename.endswith(".docx"):
+            return extract_text_from_docx(resume.file)
+        raise HTTPException(status_code=400, detail="Unsupported resume type. Use PDF or DOCX.")
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=f"Failed to parse resume file: {exc}") from exc
+
+
+def _json_flag(payload, name):
+    """A JSON boolean field (``false`` when absent or null); anything else is a 400."""
+    value = payload.get(name)
+    if value is None:
+        return False
+    if not isinstance(value, bool):
+        raise HTTPException(status_code=400, detail=f"{name} must be true or false.")
+    return value
+
+
+def _parse_threshold(value):
+    if value is None:
+        return None
+    threshold = None
+    if not isinstance(value, bool):
+        try:
+            threshold = float(value)
+        except (TypeError, ValueError):
+            pass
+    # NaN fails the range check too
+    if threshold is None or not 0.0 <= threshold <= 1.0:
+        raise HTTPException(status_code=400, detail="match_threshold must be a number between 0 and 1.")
+    return threshold
+
+
+def _parse_top_k(value):
+    if value is None:
+        return 5
+    top_k = None
+    if not isinstance(value, bool) and not (isinstance(value, float) and not value.is_integer()):
+        try:
+            top_k = int(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    if top_k is None or top_k < 1:
+        raise HTTPException(status_code=400, detail="top_k must be a positive integer.")
+    return top_k
+
+
 @app.post("/analyze")
 async def analyze(
     request: Request,
     job_role: str | None = Form(None),
     github_username: str | None = Form(None),
+    fuzzy: bool = Form(False),
+    candidate_id: str | None = Form(None),
+    match_mode: str = Form("lexical"),
+    match_threshold: float | None = Form(None),
     resume: UploadFile | None = File(None)
 ):
     content_type = (request.headers.get("content-type") or "").lower()
@@ -21,44 +122,261 @@ async def analyze(
         job_role = (payload.get("job_role") or "").strip()
         github_username = (payload.get("github_username") or "").strip()
         resume_text = (payload.get("resume_text") or "").strip()
+        fuzzy = _json_flag(payload, "fuzzy")
+        candidate_id = payload.get("candidate_id")
+        match_mode = payload.get("match_mode") or "lexical"
+        match_threshold = payload.get("match_threshold")
     else:
         job_role = (job_role or "").strip()
         github_username = (github_username or "").strip()
-
-        if not resume:
-            raise HTTPException(status_code=400, detail="Missing resume file in form-data.")
-
-        filename = (resume.filename or "").lower()
-        try:
-            if filename.endswith(".pdf"):
-                resume_text = extract_text_from_pdf(resume.file)
-            elif filename.endswith(".docx"):
-                resume_text = extract_text_from_docx(resume.file)
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported resume type. Use PDF or DOCX.")
-        except HTTPException:
-            raise
-        except Exception as exc:
-            raise HTTPException(status_code=400, detail=f"Failed to parse resume file: {exc}") from exc
+        resume_text = _read_resume_upload(resume)
 
     if not job_role:
         raise HTTPException(status_code=400, detail="job_role is required.")
     if not resume_text:
         raise HTTPException(status_code=400, detail="Resume content is empty or missing.")
+    if match_mode not in MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"match_mode must be one of: {', '.join(MATCH_MODES)}")
+    match_threshold = _parse_threshold(match_threshold)
 
-    user_skills = extract_skills_from_resume(resume_text)
+    taxonomy_version = get_taxonomy().version
+    user_skills = extract_skills_from_resume(resume_text, fuzzy=fuzzy)
     job_skills = get_skills_for_role(job_role)
 
     if not job_skills:
         raise HTTPException(status_code=400, detail=f"Unsupported job_role: {job_role}")
 
-    matched, missing, score = analyze_skill_gap(user_skills, job_skills)
+    # semantic / hybrid modes wait on the embedding batcher; keep that off the event loop
+    matched, missing, score, skill_scores = await run_in_threadpool(
+        analyze_skill_gap, user_skills, job_skills, mode=match_mode, threshold=match_threshold, with_scores=True
+    )
 
-    github_data = analyze_github_profile(github_username) if github_username else None
+    if candidate_id:
+        # SQLite write (and the index's first open); keep it off the event loop like the gap analysis
+        candidate_id = str(candidate_id).strip()
+        await run_in_threadpool(lambda: get_candidate_index().add(candidate_id, user_skills))
+
+    github_data = await analyze_github_profile_async(github_username) if github_username else None
 
     return {
         "matched_skills": matched,
         "missing_skills": missing,
         "score": score,
-        "github": github_data
+        "skill_scores": skill_scores,
+        "github": github_data,
+        "taxonomy_version": taxonomy_version
     }
+
+
+@app.post("/rank-roles")
+async def rank_roles_endpoint(
+    request: Request,
+    top_k: int = Form(5),
+    fuzzy: bool = Form(False),
+    semantic: bool = Form(False),
+    resume: UploadFile | None = File(None)
+):
+    content_type = (request.headers.get("content-type") or "").lower()
+    user_skills = None
+
+    if "application/json" in content_type:
+        payload = await request.json()
+        top_k = payload.get("top_k")
+        fuzzy = _json_flag(payload, "fuzzy")
+        semantic = _json_flag(payload, "semantic")
+        user_skills = payload.get("skills")
+        resume_text = (payload.get("resume_text") or "").strip()
+    else:
+        resume_text = _read_resume_upload(resume)
+
+    top_k = _parse_top_k(top_k)
+    if user_skills is None:
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Provide resume_text, skills or a resume file.")
+        user_skills = extract_skills_from_resume(resume_text, fuzzy=fuzzy)
+
+    # semantic ranking waits on the embedding batcher; keep that off the event loop
+    roles = await run_in_threadpool(
+        rank_roles, user_skills, top_k=top_k, resume_text=resume_text if semantic else None
+    )
+    return {
+        "skills": user_skills,
+        "roles": roles,
+        "taxonomy_version": get_taxonomy().version
+    }
+
+
+@app.post("/candidates")
+async def index_candidate(
+    request: Request,
+    candidate_id: str | None = Form(None),
+    fuzzy: bool = Form(False),
+    resume: UploadFile | None = File(None)
+):
+    content_type = (request.headers.get("content-type") or "").lower()
+    user_skills = None
+
+    if "application/json" in content_type:
+        payload = await request.json()
+        candidate_id = payload.get("candidate_id")
+        fuzzy = _json_flag(payload, "fuzzy")
+        user_skills = payload.get("skills")
+        resume_text = (payload.get("resume_text") or "").strip()
+    else:
+        resume_text = _read_resume_upload(resume)
+
+    candidate_id = str(candidate_id or "").strip()
+    if not candidate_id:
+        raise HTTPException(status_code=400, detail="candidate_id is required.")
+    if user_skills is None:
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Provide resume_text, skills or a resume file.")
+        user_skills = extract_skills_from_resume(resume_text, fuzzy=fuzzy)
+
+    await run_in_threadpool(lambda: get_candidate_index().add(candidate_id, user_skills))
+    return {"candidate_id": candidate_id, "skills": user_skills}
+
+
+@app.delete("/candidates/{candidate_id}")
+def remove_candidate(candidate_id: str):
+    if not get_candidate_index().remove(candidate_id):
+        raise HTTPException(status_code=404, detail=f"Unknown candidate: {candidate_id}")
+    return {"candidate_id": candidate_id, "removed": True}
+
+
+@app.get("/candidates/search")
+async def search_candidates(role: str, max_missing: int | None = None, top: int | None = None):
+    if not get_skills_for_role(role):
+        raise HTTPException(status_code=400, detail=f"Unsupported job_role: {role}")
+    candidates = await run_in_threadpool(
+        lambda: get_candidate_index().search(role, max_missing=max_missing, top_n=top)
+    )
+    return {"role": role, "candidates": candidates}
+
+
+@app.get("/github/cache-stats")
+def github_cache_stats_endpoint():
+    return github_cache_stats()
+
+
+@app.get("/github/rate-limit")
+def github_rate_limit_endpoint():
+    return github_rate_limit_status()
+
+
+@app.get("/ai/status")
+def ai_status_endpoint():
+    return ollama_status()
+
+
+@app.get("/ai/cache-stats")
+def ai_cache_stats_endpoint():
+    return llm_cache_stats()
+
+
+AI_STREAM_SECTIONS = ("recommendations", "roadmap", "audit", "cover_letter", "github_feedback")
+# fields of an analyze_github_profile result that the feedback prompt reads
+GITHUB_PROFILE_KEYS = ("total_repos", "followers", "total_stars", "languages")
+
+
+async def _ai_stream_section(section, payload):
+    """``(prompt, finish)`` for one streamable generator; ``finish`` applies the usual validation and fallback."""
+    role = (payload.get("job_role") or "").strip()
+    resume_text = (payload.get("resume_text") or "").strip()
+    matched = payload.get("matched_skills")
+    missing = payload.get("missing_skills")
+    if section != "github_feedback" and not role:
+        raise HTTPException(status_code=400, detail="job_role is required.")
+    if section in ("recommendations", "roadmap", "cover_letter") and (missing is None or matched is None):
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Provide missing_skills (and matched_skills) or resume_text.")
+        job_skills = get_skills_for_role(role)
+        if not job_skills:
+            raise HTTPException(status_code=400, detail=f"Unsupported job_role: {role}")
+        found, gap, _ = analyze_skill_gap(extract_skills_from_resume(resume_text), job_skills)
+        matched = found if matched is None else matched
+        missing = gap if missing is None else missing
+
+    if section == "recommendations":
+        return recommendations_prompt(missing, role), lambda text: finish_recommendations(text, missing)
+    if section == "roadmap":
+        return roadmap_prompt(missing, role), lambda text: finish_learning_roadmap(text, missing, role)
+    if section == "audit":
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="resume_text is required.")
+        return audit_prompt(resume_text, role), lambda text: finish_audit(text, role)
+    if section == "cover_letter":
+        user_name = payload.get("user_name") or ""
+        company_name = payload.get("company_name") or ""
+        prompt = cover_letter_prompt(user_name, company_name, role, matched, missing)
+        return prompt, lambda text: finish_cover_letter(text, user_name, company_name, role, matched)
+
+    username = (payload.get("github_username") or "").strip()
+    profile = payload.get("github")
+    if profile is not None:
+        missing_keys = [key for key in GITHUB_PROFILE_KEYS if key not in profile] if isinstance(profile, dict) else None
+        if missing_keys is None or missing_keys:
+            raise HTTPException(
+                status_code=400,
+                detail=f"github must be an object with: {', '.join(GITHUB_PROFILE_KEYS)}",
+            )
+    elif username:
+        profile = await analyze_github_profile_async(username)
+    if not profile:
+        raise HTTPException(status_code=400, detail="Provide github_username or a github profile.")
+    return github_feedback_prompt(username or "candidate", profile), finish_github_feedback
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_events(prompt, finish):
+    parts = []
+    for token in stream_ollama(prompt):
+        parts.append(token)
+        yield _sse("token", {"text": token})
+    yield _sse("done", {"result": finish("".join(parts))})
+
+
+@app.post("/ai/stream/{section}")
+async def ai_stream_endpoint(section: str, request: Request):
+    """Server-Sent Events: one ``token`` event per generated token, then ``done`` with the final result.
+
+    If Ollama is unavailable no tokens are sent and ``done`` carries the
+    fallback result.
+    """
+    if section not in AI_STREAM_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"section must be one of: {', '.join(AI_STREAM_SECTIONS)}")
+    prompt, finish = await _ai_stream_section(section, await request.json())
+    return StreamingResponse(
+        _sse_events(prompt, finish),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/team/analyze")
+async def analyze_team_endpoint(request: Request):
+    payload = await request.json()
+    org = (payload.get("org") or "").strip() or None
+    usernames = payload.get("usernames") or []
+    if isinstance(usernames, str):
+        usernames = [u.strip() for u in usernames.split(",")]
+    role = (payload.get("role") or "").strip() or None
+
+    if not org and not any(usernames):
+        raise HTTPException(status_code=400, detail="Provide an org or a list of usernames.")
+    if role and not get_skills_for_role(role):
+        raise HTTPException(status_code=400, detail=f"Unsupported job_role: {role}")
+
+    result = await analyze_team_async(
+        org=org,
+        usernames=usernames,
+        role=role,
+        deep=_json_flag(payload, "deep"),
+        member_skills=payload.get("member_skills") or {},
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Could not read GitHub org: {org}")
+    return result
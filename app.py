@@ -5,25 +5,29 @@ import pandas as pd
 from datetime import datetime
 from html import escape as html_escape
 import re
-import requests
 import time
 
-from github_analyzer import analyze_github_profile, analyze_github_with_ai
+from github_analyzer import analyze_github_profile, github_feedback_prompt, finish_github_feedback
+from gen_ai_engine import check_ollama_status, llm_cache_stats, stream_ollama, audit_prompt, finish_audit, roadmap_prompt
 from resume_parser import extract_text_from_pdf, extract_text_from_docx, extract_skills_from_resume
 from utils import get_skills_for_role, calculate_github_score
 from gap_engine import (
     analyze_skill_gap, 
     calculate_career_readiness, 
     generate_recommendations, 
+    generate_ai_analysis,
     calculate_resume_quality, 
     calculate_experience_level,
     calculate_ai_proficiency,
     analyze_resume_impact,
     get_detailed_recommendations,
-    ai_resume_audit,
-    generate_learning_roadmap
+    recommendations_prompt,
+    finish_recommendations,
+    finish_learning_roadmap
 )
-from job_roles_data import job_roles
+from taxonomy import get_taxonomy
+from role_fit import rank_roles
+from team_analysis import analyze_team
 
 # Page Config
 st.set_page_config(page_title="AI Opportunity Gap Analyzer", layout="wide", page_icon="🚀", initial_sidebar_state="expanded")
@@ -484,30 +488,37 @@ def cached_extract_pdf(file):
 def cached_extract_docx(file):
     return extract_text_from_docx(file)
 
-@st.cache_data(ttl=600)
-def cached_analyze_skills(user_skills, job_skills):
-    return analyze_skill_gap(user_skills, job_skills)
-
+# taxonomy_version is part of the cache key so a reloaded taxonomy invalidates results.
 @st.cache_data(ttl=3600)
-def cached_github_analysis(username):
-    return analyze_github_profile(username)
+def cached_extract_skills(resume_text, fuzzy, taxonomy_version):
+    return extract_skills_from_resume(resume_text, fuzzy=fuzzy)
 
-@st.cache_data(ttl=3600)
-def cached_github_ai_feedback(username, data):
-    return analyze_github_with_ai(username, data)
+# short TTL: github_analyzer keeps an on-disk ETag cache shared with the API
+@st.cache_data(ttl=300)
+def cached_github_analysis(username, deep=False):
+    return analyze_github_profile(username, deep=deep)
 
-@st.cache_data(ttl=3600)
-def cached_ai_resume_audit(text, role):
-    return ai_resume_audit(text, role)
+@st.cache_data(ttl=300)
+def cached_team_analysis(org, usernames, role, deep):
+    return analyze_team(org=org or None, usernames=list(usernames), role=role, deep=deep)
 
-@st.cache_data(ttl=3600)
-def cached_ai_recommendations(missing, role):
-    from gap_engine import generate_recommendations
-    return generate_recommendations(missing, role)
+def stream_ai_section(key, prompt, finish):
+    """Render a pending AI section token by token, then keep its validated result in session state.
 
-@st.cache_data(ttl=3600)
-def cached_ai_roadmap(missing, role):
-    return generate_learning_roadmap(missing, role)
+    ``finish`` turns the raw text (empty if Ollama is unavailable) into the
+    final value, falling back to the mock generator when needed.
+    """
+    pending = st.session_state.get("ai_pending") or set()
+    if key in pending:
+        slot = st.empty()
+        text = ""
+        if prompt:
+            with slot.container():
+                text = st.write_stream(stream_ollama(prompt))
+        st.session_state[key] = finish(text if isinstance(text, str) else "")
+        pending.discard(key)
+        slot.empty()
+    return st.session_state.get(key)
 
 # --- HELPER UI FUNCTIONS ---
 def metric_card_html(label, value, subtext="", color="var(--primary-color)"):
@@ -770,15 +781,37 @@ def _render_timeline_roadmap(roadmap_text):
 
 # --- SIDEBAR ---
 with st.sidebar:
-    role = st.selectbox("Job Role", list(job_roles.keys()))
+    role = st.selectbox("Job Role", list(get_taxonomy().role_names))
     st.markdown('<div class="upload-title">Resume (PDF/DOCX)</div>', unsafe_allow_html=True)
     uploaded_file = st.file_uploader("", type=["pdf", "docx"], label_visibility="collapsed", key="resume_uploader")
     if uploaded_file is not None:
         st.session_state.uploaded_resume = uploaded_file
     github_username = st.text_input("GitHub Username")
+    deep_github = st.checkbox(
+        "Deep GitHub language analysis",
+        value=False,
+        help="Fetch the language byte breakdown of every repository (slower on first run).",
+    )
+    fuzzy_skills = st.checkbox("Typo-tolerant skill matching", value=False)
+    match_mode = st.selectbox(
+        "Skill Matching",
+        ["lexical", "hybrid", "semantic"],
+        format_func=lambda m: {"lexical": "Lexical (fast)", "hybrid": "Hybrid (lexical + AI)", "semantic": "Semantic (AI)"}[m],
+    )
+    combined_ai = st.checkbox(
+        "Single AI request",
+        value=True,
+        help="Generate recommendations, roadmap, audit and GitHub review in one request. "
+             "Turn off to stream each section as it is written.",
+    )
     
     st.markdown("---")
     analyze_btn = st.button("Run Analysis", type="primary")
+
+    with st.expander("Team Analysis"):
+        team_org = st.text_input("GitHub Organization")
+        team_users = st.text_input("Or Usernames (comma-separated)")
+        team_btn = st.button("Analyze Team")
     
     st.markdown("""
         <div style="margin-top:2rem; font-size:0.8rem; color:#9CA3AF;">
@@ -786,14 +819,14 @@ with st.sidebar:
         </div>
     """, unsafe_allow_html=True)
 
-    # Check Local AI Status
-    try:
-        if requests.get("http://localhost:11434/api/tags", timeout=1).status_code == 200:
-            st.success("🟢 Local AI Active")
-        else:
-            st.warning("⚫ Local AI Offline")
-    except:
+    # Local AI status, as last seen by the background health poller
+    if check_ollama_status():
+        st.success("🟢 Local AI Active")
+    else:
         st.warning("⚫ Local AI Offline")
+    llm_stats = llm_cache_stats()
+    if llm_stats["hits"]:
+        st.caption(f"AI cache: {llm_stats['hit_ratio']:.0%} hits, {llm_stats['tokens_saved']:,} tokens saved")
 
 # --- MAIN CONTENT ---
 # --- SESSION STATE INITIALIZATION ---
@@ -860,23 +893,17 @@ if analyze_btn and effective_resume:
                 resume_text = cached_extract_docx(effective_resume)
                 
             # Analysis
-            user_skills = extract_skills_from_resume(resume_text)
+            taxonomy_version = get_taxonomy().version
+            user_skills = cached_extract_skills(resume_text, fuzzy_skills, taxonomy_version)
             job_skills = get_skills_for_role(role)
-            # Hard bypass of cached_analyze_skills: deterministic fast lexical match.
-            user_lower = [s.lower().strip() for s in user_skills]
-            matched = []
-            for js in job_skills:
-                j = js.lower().strip()
-                if any(
-                    j == u
-                    or j in u
-                    or u in j
-                    or bool(set(j.split()) & set(u.split()))
-                    for u in user_lower
-                ):
-                    matched.append(js)
-            missing = [skill for skill in job_skills if skill not in matched]
-            score = (len(matched) / len(job_skills)) * 100 if job_skills else 0
+            matched, missing, score, skill_scores = analyze_skill_gap(
+                user_skills, job_skills, mode=match_mode, with_scores=True
+            )
+            role_fit = rank_roles(
+                user_skills,
+                top_k=len(get_taxonomy().role_names),
+                resume_text=resume_text if match_mode != "lexical" else None,
+            )
             
             resume_quality_score, resume_feedback = calculate_resume_quality(resume_text)
             experience_level = calculate_experience_level(resume_text)
@@ -889,21 +916,26 @@ if analyze_btn and effective_resume:
             
             github_username = github_username.strip()
             if github_username:
-                github_data = cached_github_analysis(github_username)
+                github_data = cached_github_analysis(github_username, deep_github)
                 if github_data:
                     github_score = calculate_github_score(github_data)
 
             career_score = calculate_career_readiness(score, github_score)
 
-            # Generate complete AI analysis in one run.
-            ai_primary = cached_ai_recommendations(missing, role)
-            ai_fallback = get_detailed_recommendations(missing)
-            ai_recs = merge_recommendations(ai_primary, ai_fallback, min_items=8)
-            ai_roadmap = cached_ai_roadmap(missing, role)
-            ai_audit = cached_ai_resume_audit(resume_text, role)
-            github_feedback = None
-            if github_username and github_data:
-                github_feedback = cached_github_ai_feedback(github_username, github_data)
+            ai_recs = ai_roadmap = ai_audit = None
+            if combined_ai:
+                # one JSON request for every AI section; failed sections are retried or mocked
+                ai = generate_ai_analysis(missing, role, resume_text, github_username, github_data)
+                ai_recs = merge_recommendations(ai["recommendations"], get_detailed_recommendations(missing), min_items=8)
+                ai_roadmap = ai["roadmap"]
+                ai_audit = ai["audit"]
+                github_feedback = ai["github_feedback"]
+                ai_pending = set()
+            else:
+                # AI sections are streamed into their panels when the results render.
+                ai_pending = {"ai_recs", "ai_roadmap", "ai_audit"}
+                if github_username and github_data:
+                    ai_pending.add("github_feedback")
             
             # Save to Session State
             st.session_state.analysis_complete = True
@@ -912,6 +944,8 @@ if analyze_btn and effective_resume:
             st.session_state.matched = matched
             st.session_state.missing = missing
             st.session_state.score = score
+            st.session_state.role_fit = role_fit
+            st.session_state.skill_scores = skill_scores
             st.session_state.resume_quality_score = resume_quality_score
             st.session_state.resume_feedback = resume_feedback
             st.session_state.experience_level = experience_level
@@ -923,6 +957,7 @@ if analyze_btn and effective_resume:
             st.session_state.ai_recs = ai_recs
             st.session_state.ai_roadmap = ai_roadmap
             st.session_state.ai_audit = ai_audit
+            st.session_state.ai_pending = ai_pending
             st.session_state.github_data_exists = bool(github_data)
             st.session_state.github_data = github_data
             st.session_state.github_feedback = github_feedback
@@ -950,12 +985,10 @@ if st.session_state.analysis_complete:
     impact_score = st.session_state.impact_score
     impact_feedback = st.session_state.impact_feedback
     github_score = st.session_state.github_score
-    ai_recs = st.session_state.ai_recs
-    ai_audit = st.session_state.ai_audit
     github_data_exists = st.session_state.github_data_exists
     github_data = st.session_state.github_data
-    github_feedback = st.session_state.github_feedback
     github_username = st.session_state.github_username
+    resume_text = st.session_state.resume_text
     
     # --- DASHBOARD ---
     st.markdown(f"## Analysis for **{role}**")
@@ -972,7 +1005,7 @@ if st.session_state.analysis_complete:
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Tabs
-    tabs = st.tabs(["Overview", "Skills & Gaps", "Resume", "GitHub", "Roadmap", "Report"])
+    tabs = st.tabs(["Overview", "Skills & Gaps", "Role Fit", "Resume", "GitHub", "Roadmap", "Report"])
     
     # Tab 1: Overview
     with tabs[0]:
@@ -1007,10 +1040,15 @@ if st.session_state.analysis_complete:
             st.info(f"**{experience_level}**")
             st.markdown(f"*{ai_level_desc}*")
 
-        if st.session_state.get("github_feedback"):
+        if github_data_exists and github_data:
             st.markdown("---")
             st.markdown("### 🤖 Senior Recruiter Feedback (AI)")
-            st.info(st.session_state.github_feedback)
+            github_feedback = stream_ai_section(
+                "github_feedback",
+                github_feedback_prompt(github_username, github_data),
+                finish_github_feedback,
+            )
+            st.info(github_feedback)
 
     # Tab 2: Skills
     with tabs[1]:
@@ -1024,13 +1062,51 @@ if st.session_state.analysis_complete:
             st.markdown("#### ⚠️ Missing Skills")
             html = "".join([skill_chip(s, "missing") for s in missing])
             st.markdown(html, unsafe_allow_html=True)
+        skill_scores = st.session_state.get("skill_scores") or {}
+        if any(0 < v < 1 for v in skill_scores.values()):
+            with st.expander("Match confidence"):
+                st.dataframe(
+                    pd.DataFrame({"Skill": list(skill_scores), "Similarity": [round(v, 3) for v in skill_scores.values()]}),
+                    hide_index=True,
+                )
         st.markdown("<br>#### Recommended Projects", unsafe_allow_html=True)
-        if st.session_state.get("ai_recs"):
-            for rec in st.session_state.ai_recs:
-                st.info(rec)
+        ai_recs = stream_ai_section(
+            "ai_recs",
+            recommendations_prompt(missing, role) if missing else None,
+            lambda text: merge_recommendations(
+                finish_recommendations(text, missing) if missing else [],
+                get_detailed_recommendations(missing),
+                min_items=8,
+            ),
+        )
+        for rec in ai_recs or []:
+            st.info(rec)
 
-        # Tab 3: Resume
+    # Tab 3: Role Fit
     with tabs[2]:
+        role_fit = st.session_state.get("role_fit") or []
+        if role_fit:
+            st.markdown("#### Best-Fit Roles")
+            top_roles = role_fit[:3]
+            cols = st.columns(len(top_roles))
+            for col, fit in zip(cols, top_roles):
+                with col:
+                    label = f"{fit['role']} (selected)" if fit["role"] == role else fit["role"]
+                    st.metric(label, f"{fit['score']:.0f}%")
+                    st.markdown("".join([skill_chip(s, "success") for s in fit["matched"]]), unsafe_allow_html=True)
+                    st.markdown("".join([skill_chip(s, "missing") for s in fit["missing"]]), unsafe_allow_html=True)
+
+            st.markdown("#### All Roles")
+            fit_df = pd.DataFrame({"Role": [f["role"] for f in role_fit], "Match %": [round(f["score"], 1) for f in role_fit]})
+            if any(f.get("semantic_score") is not None for f in role_fit):
+                # how close the resume prose reads to each role, beyond listed skills
+                fit_df["Semantic fit %"] = [round(f.get("semantic_score") or 0.0, 1) for f in role_fit]
+            st.bar_chart(fit_df.set_index("Role"))
+        else:
+            st.info("Run analysis to compare your profile against every role.")
+
+        # Tab 4: Resume
+    with tabs[3]:
         c1, c2 = st.columns(2)
         with c1:
             st.markdown("#### Quality Audit")
@@ -1041,13 +1117,14 @@ if st.session_state.analysis_complete:
             st.metric("Impact Score", f"{impact_score}/100")
             st.progress(impact_score)
             for f in impact_feedback: st.info(f)
-        if st.session_state.get("ai_audit"):
-            st.markdown("---")
-            st.markdown("### Deep Dive Audit (AI)")
-            st.warning(st.session_state.ai_audit)
+        st.markdown("---")
+        st.markdown("### Deep Dive Audit (AI)")
+        ai_audit = stream_ai_section("ai_audit", audit_prompt(resume_text, role), lambda text: finish_audit(text, role))
+        if ai_audit:
+            st.warning(ai_audit)
 
-    # Tab 4: GitHub
-    with tabs[3]:
+    # Tab 5: GitHub
+    with tabs[4]:
         st.markdown("### GitHub Analysis")
         if github_data_exists and github_data:
             g1, g2, g3 = st.columns(3)
@@ -1059,7 +1136,12 @@ if st.session_state.analysis_complete:
                 st.metric("Total Stars", int(github_data.get("total_stars", 0)))
 
             langs = github_data.get("languages", {}) or {}
-            if langs:
+            shares = github_data.get("language_shares") or {}
+            if shares:
+                st.markdown("#### Language Footprint (share of code)")
+                lang_df = pd.DataFrame({"Language": list(shares.keys()), "Share %": [round(v * 100, 1) for v in shares.values()]})
+                st.bar_chart(lang_df.set_index("Language"))
+            elif langs:
                 st.markdown("#### Language Footprint")
                 lang_df = pd.DataFrame({"Language": list(langs.keys()), "Repositories": list(langs.values())})
                 st.bar_chart(lang_df.set_index("Language"))
@@ -1068,37 +1150,81 @@ if st.session_state.analysis_complete:
             for tip in get_github_recommendations(github_data):
                 st.info(tip)
 
-            if github_feedback:
+            if st.session_state.get("github_feedback"):
                 st.markdown("#### AI Reviewer Notes")
-                st.info(github_feedback)
+                st.info(st.session_state.github_feedback)
         else:
             st.info("No GitHub data found. Enter a valid GitHub username and run analysis again.")
 
-        # Tab 5: Roadmap
-    with tabs[4]:
+        # Tab 6: Roadmap
+    with tabs[5]:
         st.markdown("### AI Learning Roadmap")
+        stream_ai_section(
+            "ai_roadmap", roadmap_prompt(missing, role), lambda text: finish_learning_roadmap(text, missing, role)
+        )
         if st.session_state.get("ai_roadmap"):
             if not _render_timeline_roadmap(st.session_state.ai_roadmap):
                 st.markdown(st.session_state.ai_roadmap)
         else:
             st.info("No roadmap generated yet.")
 
-    # Tab 6: Export
-    with tabs[5]:
+    # Tab 7: Export
+    with tabs[6]:
         st.markdown("### Download Report")
         report_txt = generate_full_report(
             role=role,
             career_score=career_score,
             missing_skills=missing,
-            recommendations=ai_recs,
+            recommendations=st.session_state.get("ai_recs") or [],
             github_username=github_username,
             github_data=github_data,
-            github_feedback=github_feedback,
+            github_feedback=st.session_state.get("github_feedback") or "",
         )
         st.download_button("Download PDF/Text Report", report_txt, file_name="career_report.txt")
 elif analyze_btn and not effective_resume:
     st.warning("Please upload a resume to begin.")
 
+# --- TEAM ANALYSIS ---
+if team_btn:
+    team_usernames = tuple(u.strip() for u in team_users.split(",") if u.strip())
+    if not team_org.strip() and not team_usernames:
+        st.warning("Enter a GitHub organization or at least one username.")
+    else:
+        with st.spinner("Fetching team profiles..."):
+            st.session_state.team_result = cached_team_analysis(team_org.strip(), team_usernames, role, deep_github)
+        if st.session_state.team_result is None:
+            st.error(f"Could not read GitHub organization '{team_org.strip()}'.")
+
+team_result = st.session_state.get("team_result")
+if team_result:
+    aggregate = team_result["aggregate"]
+    gap = team_result.get("gap") or {}
+    st.markdown(f"## Team Analysis for **{gap.get('role', role)}**")
+    t1, t2, t3 = st.columns(3)
+    with t1: st.metric("Members Found", f"{aggregate['members_found']}/{aggregate['members']}")
+    with t2: st.metric("Team Coverage", f"{gap.get('team_score', 0):.0f}%")
+    with t3: st.metric("Total Repos", aggregate["total_repos"])
+
+    if gap:
+        st.markdown("#### Role Skills Across the Team")
+        st.markdown("".join(
+            [skill_chip(f"{s} ({n})", "success") for s, n in gap["skill_coverage"].items() if n]
+            + [skill_chip(s, "missing") for s in gap["missing"]]
+        ), unsafe_allow_html=True)
+        member_df = pd.DataFrame({
+            "Member": list(gap["member_scores"]),
+            "Match %": [round(v, 1) for v in gap["member_scores"].values()],
+        })
+        st.bar_chart(member_df.set_index("Member"))
+
+    if aggregate.get("language_members"):
+        st.markdown("#### Languages (members using each)")
+        lang_df = pd.DataFrame({
+            "Language": list(aggregate["language_members"]),
+            "Members": list(aggregate["language_members"].values()),
+        })
+        st.bar_chart(lang_df.set_index("Language"))
+
 
 
 
@@ -0,0 +1,87 @@
+"""Recall@k and latency of the IVF skill index against exact brute-force search.
+
+Usage: python benchmark_ann.py [--synthetic N] [--k K] [--queries Q]
+
+With the external taxonomy file and a local model the real index is used
+(queries are lightly edited taxonomy entries); otherwise, or with
+``--synthetic``, clustered random unit vectors stand in for embeddings.
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from skill_ann import IVFIndex, get_ann_index, load_external_skills, EXTERNAL_TAXONOMY_PATH
+
+NPROBES = (1, 2, 4, 8, 16, 32, 64)
+
+
+def synthetic_vectors(n, dim=384, clusters=500, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_queries(vectors, count, seed=1):
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), count)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def text_queries(skills, count, seed=1):
+    rng = random.Random(seed)
+    queries = []
+    for skill in rng.sample(skills, min(count, len(skills))):
+        edits = [skill.lower(), skill + " experience", "proficient in " + skill, skill.replace(" ", "")]
+        queries.append(rng.choice(edits))
+    return queries
+
+
+def exact_top_k(vectors, queries, k):
+    scores = queries @ np.asarray(vectors).T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [set(row) for row in top]
+
+
+def main():
+    args = sys.argv[1:]
+    k = int(args[args.index("--k") + 1]) if "--k" in args else 10
+    count = int(args[args.index("--queries") + 1]) if "--queries" in args else 500
+
+    index = None
+    if "--synthetic" not in args:
+        index = get_ann_index()
+    if index is not None:
+        from semantic_matcher import encode_skills
+
+        print(f"External taxonomy {EXTERNAL_TAXONOMY_PATH}: {len(index.skills)} skills, nlist {index.nlist}")
+        queries = encode_skills(text_queries(load_external_skills(), count))
+    else:
+        n = int(args[args.index("--synthetic") + 1]) if "--synthetic" in args else 50000
+        print(f"Synthetic taxonomy: {n} unit vectors")
+        vectors = synthetic_vectors(n)
+        start = time.perf_counter()
+        index = IVFIndex.build([str(i) for i in range(n)], vectors)
+        print(f"built nlist {index.nlist} in {time.perf_counter() - start:.2f} s")
+        queries = synthetic_queries(vectors, count)
+
+    start = time.perf_counter()
+    truth = exact_top_k(index.vectors, queries, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"{'exact':<10} {exact_ms:8.3f} ms/query   recall@{k} 1.000")
+
+    for nprobe in NPROBES:
+        if nprobe > index.nlist:
+            break
+        start = time.perf_counter()
+        results = index.search(queries, k, nprobe)
+        ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = np.mean([len(t & {row for row, _ in hits}) / k for t, hits in zip(truth, results)])
+        print(f"nprobe {nprobe:<3} {ms:8.3f} ms/query   recall@{k} {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Compare the torch, int8 ONNX and static encoder backends.
+
+Each backend runs in its own subprocess so peak RSS is measured in isolation.
+Reports single-request latency (p50/p95), batch throughput, peak RSS and
+whether each backend makes the same match decisions as torch at the 0.7
+threshold. Exits non-zero when torch is unavailable or the int8 backend
+flips more than ``--max-flip-rate`` of the pair decisions (the static
+backend is only reported: its borderline pairs are re-ranked at serve time).
+
+Usage: python benchmark_encoders.py [--export] [--threads N] [--max-flip-rate R]
+  --export         build data/models/minilm-onnx-int8 and minilm-static first
+                   (needs torch + transformers)
+  --max-flip-rate  tolerated fraction of flipped pair decisions (default 0.001)
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+THRESHOLD = 0.7
+BACKENDS = ("torch", "onnx-int8", "static")
+PARITY_BACKENDS = ("onnx-int8",)
+MAX_FLIP_RATE = 0.001
+
+
+def skill_texts():
+    from job_roles_data import job_roles
+    from utils import SKILL_DATABASE, SKILL_ALIASES
+
+    texts = list(SKILL_DATABASE)
+    for skills in job_roles.values():
+        texts.extend(skills)
+    for aliases in SKILL_ALIASES.values():
+        texts.extend(aliases)
+    return list(dict.fromkeys(texts))
+
+
+def peak_rss_mb():
+    # VmHWM is reset on exec; ru_maxrss can carry over the parent's peak
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def worker(backend, output_path):
+    from encoder_backends import load_encoder
+
+    texts = skill_texts()
+    start = time.perf_counter()
+    encoder = load_encoder(backend)
+    load_s = time.perf_counter() - start
+
+    encoder.encode(texts[:8])  # warm-up
+    latencies = []
+    for text in texts[:200]:
+        start = time.perf_counter()
+        encoder.encode([text])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    vectors = np.vstack([encoder.encode(texts[i:i + 64]) for i in range(0, len(texts), 64)])
+    elapsed = time.perf_counter() - start
+    np.save(output_path, vectors)
+
+    print(json.dumps({
+        "load_s": load_s,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "texts_per_s": len(texts) / elapsed,
+        "rss_mb": peak_rss_mb(),
+    }))
+
+
+def decisions(vectors, threshold=THRESHOLD):
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, 0.0)
+    return similarity, similarity > threshold
+
+
+def main():
+    args = sys.argv[1:]
+    if "--export" in args:
+        from encoder_backends import distill_static_embeddings, export_onnx_int8
+        print("exported to", export_onnx_int8())
+        print("distilled to", distill_static_embeddings())
+    max_flip_rate = float(args[args.index("--max-flip-rate") + 1]) if "--max-flip-rate" in args else MAX_FLIP_RATE
+    env = dict(os.environ)
+    if "--threads" in args:
+        env["SKILL_ENCODER_THREADS"] = args[args.index("--threads") + 1]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            path = os.path.join(tmp, backend + ".npy")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", backend, path],
+                env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{backend:<10} unavailable: {proc.stderr.strip().splitlines()[-1:]}")
+                continue
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            results[backend] = (stats, np.load(path))
+            print(
+                f"{backend:<10} load {stats['load_s']:6.2f} s   p50 {stats['p50_ms']:7.2f} ms   "
+                f"p95 {stats['p95_ms']:7.2f} ms   {stats['texts_per_s']:8.0f} texts/s   "
+                f"peak RSS {stats['rss_mb']:7.1f} MB"
+            )
+
+    if "torch" not in results:
+        print("\nparity not checked: the torch reference backend is unavailable")
+        return 1
+    ref_scores, ref = decisions(results["torch"][1])
+    texts = skill_texts()
+    failed = []
+    for backend in BACKENDS[1:]:
+        if backend not in results:
+            if backend in PARITY_BACKENDS:
+                failed.append(backend)
+            continue
+        scores, decided = decisions(results[backend][1])
+        pairs = ref.size - len(ref)
+        flips = int((ref != decided).sum())
+        print(f"\n{backend} vs torch at {THRESHOLD}: {pairs - flips}/{pairs} pair decisions agree ({flips} flips)")
+        if backend in PARITY_BACKENDS and flips > max_flip_rate * pairs:
+            failed.append(backend)
+            print(f"FAILED: flip rate {flips / pairs:.4%} exceeds {max_flip_rate:.4%}")
+        print(f"max |cosine diff| {np.abs(ref_scores - scores).max():.4f}")
+        shown = [(i, j) for i, j in zip(*np.nonzero(ref != decided)) if i < j][:10]
+        for i, j in shown:
+            print(f"  {texts[i]!r} ~ {texts[j]!r}: torch {ref_scores[i, j]:.3f} {backend} {scores[i, j]:.3f}")
+    if failed:
+        print(f"\nparity check failed for: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], sys.argv[3])
+    else:
+        sys.exit(main())
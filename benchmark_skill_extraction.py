@@ -0,0 +1,89 @@
+"""Benchmark exact vs fuzzy skill extraction on a synthetic resume corpus.
+
+Usage: python benchmark_skill_extraction.py [num_resumes]
+"""
+import random
+import sys
+import time
+
+from utils import SKILL_DATABASE, SKILL_ALIASES
+from job_roles_data import job_roles
+from skill_matcher import compile_skill_matcher, build_fuzzy_index
+
+FILLER = (
+    "developed designed implemented led team project platform service data pipeline "
+    "customer reporting dashboard improved reduced latency users product quality "
+    "testing deployment collaborated stakeholders requirements architecture scalable"
+).split()
+
+TYPOS = {
+    "PyTorch": "Pytorch",
+    "TensorFlow": "Tensor Flow",
+    "Kubernetes": "Kubernates",
+    "PostgreSQL": "Postgre SQL",
+    "Machine Learning": "Machine Learnig",
+    "JavaScript": "Javascrpit",
+    "Scikit-learn": "Scikit learn",
+}
+
+
+def naive_extract(text, skills=SKILL_DATABASE):
+    text = text.lower()
+    return [skill for skill in skills if skill.lower() in text]
+
+
+def synthetic_taxonomy(rng, size):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    extra = {"".join(rng.choice(letters) for _ in range(rng.randint(5, 12))) for _ in range(size)}
+    return SKILL_DATABASE + sorted(extra)
+
+
+def make_resume(rng, words=450):
+    body = [rng.choice(FILLER) for _ in range(words)]
+    for skill in rng.sample(SKILL_DATABASE, 12):
+        body.insert(rng.randrange(len(body)), skill + ",")
+    typo_skills = rng.sample(sorted(TYPOS), 3)
+    for skill in typo_skills:
+        body.insert(rng.randrange(len(body)), TYPOS[skill] + ",")
+    return " ".join(body), typo_skills
+
+
+def bench(label, fn, corpus):
+    start = time.perf_counter()
+    results = [fn(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+    per_resume_ms = elapsed * 1000 / len(corpus)
+    typo_hits = sum(len(set(expected) & set(found)) for (_, expected), found in zip(corpus, results))
+    typo_total = sum(len(expected) for _, expected in corpus)
+    print(f"{label:<12} {per_resume_ms:8.3f} ms/resume   typo recall {typo_hits}/{typo_total}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = random.Random(7)
+    corpus = [make_resume(rng) for _ in range(n)]
+
+    matcher = compile_skill_matcher(SKILL_DATABASE, SKILL_ALIASES)
+    role_skills = [skill for skills in job_roles.values() for skill in skills]
+    fuzzy = build_fuzzy_index(SKILL_DATABASE + role_skills, SKILL_ALIASES)
+
+    def fuzzy_extract(text):
+        return matcher.extract(text) + fuzzy.extract(text)
+
+    print(f"Synthetic corpus: {n} resumes, {len(SKILL_DATABASE)} taxonomy skills")
+    bench("naive", naive_extract, corpus)
+    bench("exact", matcher.extract, corpus)
+    bench("fuzzy", fuzzy_extract, corpus)
+    bench("fuzzy only", fuzzy.extract, corpus)
+
+    print("\nTaxonomy scaling (exact matching only):")
+    sample = corpus[:50]
+    for size in (0, 1000, 5000):
+        skills = synthetic_taxonomy(rng, size)
+        big = compile_skill_matcher(skills)
+        bench(f"naive@{len(skills)}", lambda text: naive_extract(text, skills), sample)
+        bench(f"exact@{len(skills)}", big.extract, sample)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+
+from taxonomy import BASE_DIR, get_taxonomy
+from skill_bitsets import normalize_skill, lexical_match
+
+CANDIDATE_INDEX_PATH = os.environ.get("CANDIDATE_INDEX_PATH", os.path.join(BASE_DIR, "data", "candidates.db"))
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# ---------- Posting list encoding ----------
+def encode_postings(doc_ids):
+    """Delta + varint encode a sorted list of document ids."""
+    out = bytearray()
+    prev = 0
+    for doc_id in doc_ids:
+        delta = doc_id - prev
+        prev = doc_id
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+
+def decode_postings(blob):
+    doc_ids = []
+    value = shift = prev = 0
+    for byte in blob or b"":
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        prev += value
+        doc_ids.append(prev)
+        value = shift = 0
+    return doc_ids
+
+
+class CandidateIndex:
+    """Persistent inverted index from canonical skill to the candidates who have it.
+
+    Postings are keyed by canonical skill name (stable across taxonomy
+    reloads) and stored as compressed, sorted document-id lists in SQLite.
+    Skills outside the taxonomy are kept under their normalized text and
+    matched at search time with the gap engine's lexical rule.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CANDIDATE_INDEX_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS candidates (
+                doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                candidate_id TEXT UNIQUE NOT NULL,
+                skills TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                skill TEXT PRIMARY KEY,
+                doc_ids BLOB NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def _load_posting(self, skill):
+        row = self._conn.execute("SELECT doc_ids FROM postings WHERE skill = ?", (skill,)).fetchone()
+        return decode_postings(row[0]) if row else []
+
+    def _store_posting(self, skill, doc_ids):
+        if doc_ids:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO postings (skill, doc_ids) VALUES (?, ?)",
+                (skill, encode_postings(doc_ids)),
+            )
+        else:
+            self._conn.execute("DELETE FROM postings WHERE skill = ?", (skill,))
+
+    def _unindex(self, doc_id, skills):
+        for skill in skills:
+            doc_ids = self._load_posting(skill)
+            pos = bisect_left(doc_ids, doc_id)
+            if pos < len(doc_ids) and doc_ids[pos] == doc_id:
+                del doc_ids[pos]
+                self._store_posting(skill, doc_ids)
+
+    @staticmethod
+    def _posting_key(bitsets, skills, skill):
+        key = normalize_skill(skill)
+        idx = bitsets.ids.get(key)
+        return skills[idx] if idx is not None else key
+
+    def add(self, candidate_id, skills):
+        """Index (or re-index) a candidate's extracted skills."""
+        taxonomy = get_taxonomy()
+        skills = list(dict.fromkeys(
+            self._posting_key(taxonomy.bitsets, taxonomy.skills, s) for s in skills if s and s.strip()
+        ))
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT doc_id, skills FROM candidates WHERE candidate_id = ?", (candidate_id,)
+            ).fetchone()
+            if row:
+                self._unindex(row[0], json.loads(row[1]))
+                self._conn.execute("DELETE FROM candidates WHERE doc_id = ?", (row[0],))
+            # a fresh doc id is always the largest, so postings stay sorted by appending
+            cur = self._conn.execute(
+                "INSERT INTO candidates (candidate_id, skills, updated_at) VALUES (?, ?, ?)",
+                (candidate_id, json.dumps(skills), time.time()),
+            )
+            doc_id = cur.lastrowid
+            for skill in skills:
+                doc_ids = self._load_posting(skill)
+                doc_ids.append(doc_id)
+                self._store_posting(skill, doc_ids)
+        return doc_id
+
+    def remove(self, candidate_id):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT doc_id, skills FROM candidates WHERE candidate_id = ?", (candidate_id,)
+            ).fetchone()
+            if not row:
+                return False
+            self._unindex(row[0], json.loads(row[1]))
+            self._conn.execute("DELETE FROM candidates WHERE doc_id = ?", (row[0],))
+        return True
+
+    def _candidate_names(self, doc_ids, chunk=500):
+        names = {}
+        for start in range(0, len(doc_ids), chunk):
+            part = doc_ids[start:start + chunk]
+            names.update(self._conn.execute(
+                "SELECT doc_id, candidate_id FROM candidates WHERE doc_id IN (%s)" % ",".join("?" * len(part)),
+                part,
+            ).fetchall())
+        return names
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+
+    def search(self, role, max_missing=None, top_n=None):
+        """Candidates for ``role`` ordered by fewest missing skills.
+
+        ``max_missing`` keeps only candidates missing at most that many of the
+        role's skills; ``top_n`` limits the result size.
+        """
+        taxonomy = get_taxonomy()
+        role_ids = list(taxonomy.role_skill_ids(role))
+        if not role_ids:
+            return []
+        bitsets = taxonomy.bitsets
+
+        with self._lock:
+            postings = {}
+            covered = {}
+            free_keys = [
+                key for (key,) in self._conn.execute("SELECT skill FROM postings")
+                if normalize_skill(key) not in bitsets.ids
+            ]
+            for pos, idx in enumerate(role_ids):
+                docs = set()
+                for other in bitsets.iter_ids(bitsets.masks[idx]):
+                    if other not in postings:
+                        postings[other] = self._load_posting(taxonomy.skills[other])
+                    docs.update(postings[other])
+                for key in free_keys:
+                    if lexical_match(normalize_skill(key), bitsets.keys[idx]):
+                        if key not in postings:
+                            postings[key] = self._load_posting(key)
+                        docs.update(postings[key])
+                for doc_id in docs:
+                    covered.setdefault(doc_id, set()).add(pos)
+
+            if max_missing is not None and max_missing >= len(role_ids):
+                # candidates sharing no role skill qualify too
+                doc_ids = [r[0] for r in self._conn.execute("SELECT doc_id FROM candidates")]
+            else:
+                doc_ids = list(covered)
+            names = self._candidate_names(doc_ids)
+
+        role_skills = [taxonomy.skills[i] for i in role_ids]
+        results = []
+        for doc_id in doc_ids:
+            hits = covered.get(doc_id, set())
+            missing = [skill for pos, skill in enumerate(role_skills) if pos not in hits]
+            if max_missing is not None and len(missing) > max_missing:
+                continue
+            results.append({
+                "candidate_id": names[doc_id],
+                "score": (len(hits) / len(role_ids)) * 100,
+                "missing_count": len(missing),
+                "missing": missing,
+            })
+
+        results.sort(key=lambda r: (r["missing_count"], r["candidate_id"]))
+        return results[:top_n] if top_n else results
+
+
+def get_candidate_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CandidateIndex()
+    return _index
+
+
+def selftest():
+    """Check ``search`` against ``analyze_skill_gap`` for every role; exits non-zero on a mismatch."""
+    import random
+    import sys
+    import tempfile
+
+    from gap_engine import analyze_skill_gap
+
+    taxonomy = get_taxonomy()
+    rng = random.Random(0)
+    free_text = ["machine learning pipelines", "excel", "public speaking", "sql tuning", "react native"]
+    candidates = {}
+    for n in range(200):
+        skills = rng.sample(taxonomy.skills, rng.randint(0, 12)) + rng.sample(free_text, rng.randint(0, 2))
+        # extracted and user-supplied skills arrive in any casing
+        candidates[f"c{n}"] = [s.lower() if rng.random() < 0.5 else s for s in skills]
+    candidates["b"] = ["python", "sql"]
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        index = CandidateIndex(os.path.join(tmp, "candidates.db"))
+        for candidate_id, skills in candidates.items():
+            index.add(candidate_id, skills)
+        for role in taxonomy.role_names:
+            found = {r["candidate_id"]: r for r in index.search(role, max_missing=len(taxonomy.role_skills(role)))}
+            for candidate_id, skills in candidates.items():
+                _, missing, score = analyze_skill_gap(skills, taxonomy.role_skills(role))
+                result = found.get(candidate_id)
+                if result is None or abs(result["score"] - score) > 1e-9 or set(result["missing"]) != set(missing):
+                    failures += 1
+                    print(f"mismatch for {candidate_id} / {role}: index {result and result['score']} gap {score}")
+        index._conn.close()
+    print(f"{len(candidates)} candidates x {len(taxonomy.role_names)} roles: {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    selftest()
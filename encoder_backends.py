@@ -0,0 +1,266 @@
+"""Pluggable sentence encoders for the semantic skill matcher.
+
+Select one with ``SKILL_ENCODER_BACKEND``:
+
+* ``torch``     - sentence-transformers on PyTorch (default)
+* ``onnx-int8`` - dynamically int8-quantized ONNX export of the same model,
+  run with onnxruntime; needs ``onnxruntime`` and ``tokenizers`` and a model
+  produced once by :func:`export_onnx_int8`
+* ``static``    - a token -> vector table distilled from the model by
+  :func:`distill_static_embeddings`; phrases are mean-pooled from the table
+  with NumPy alone
+
+``SKILL_ENCODER_THREADS`` caps intra-op threads for either backend.
+Every backend returns L2-normalized float32 rows.
+"""
+import json
+import os
+import unicodedata
+
+import numpy as np
+
+from taxonomy import BASE_DIR
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_PATH = os.environ.get("SKILL_MODEL_PATH", MODEL_NAME)
+HF_MODEL_ID = os.environ.get("SKILL_HF_MODEL_ID", "sentence-transformers/" + MODEL_NAME)
+ENCODER_BACKEND = os.environ.get("SKILL_ENCODER_BACKEND", "torch")
+ENCODER_THREADS = int(os.environ.get("SKILL_ENCODER_THREADS", "0"))
+MODELS_DIR = os.environ.get("SKILL_MODELS_DIR", os.path.join(BASE_DIR, "data", "models"))
+ONNX_INT8_DIR = os.path.join(MODELS_DIR, "minilm-onnx-int8")
+STATIC_DIR = os.path.join(MODELS_DIR, "minilm-static")
+MAX_SEQ_LENGTH = 256
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class TorchEncoder:
+    name = "torch"
+
+    def __init__(self, threads=ENCODER_THREADS):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.model = SentenceTransformer(MODEL_PATH, local_files_only=True)
+
+    def encode(self, texts):
+        return np.asarray(
+            self.model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True),
+            dtype=np.float32,
+        )
+
+
+class OnnxInt8Encoder:
+    name = "onnx-int8"
+
+    def __init__(self, model_dir=ONNX_INT8_DIR, threads=ENCODER_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        hidden = self.session.run(None, feeds)[0]
+        # mean pooling over real tokens, as in the sentence-transformers model
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return _normalize(pooled)
+
+
+def _is_cjk(code):
+    # BERT tokenizes every CJK ideograph as a word of its own
+    return (0x4E00 <= code <= 0x9FFF or 0x3400 <= code <= 0x4DBF
+            or 0xF900 <= code <= 0xFAFF or 0x20000 <= code <= 0x2FA1F)
+
+
+class _WordPiece:
+    """Pure-Python BERT tokenizer (basic split + greedy WordPiece) over ``vocab.txt``."""
+
+    def __init__(self, vocab_path, lowercase=True, unk_token="[UNK]", max_chars=100):
+        with open(vocab_path, "r", encoding="utf-8") as fh:
+            self.vocab = {line.rstrip("\n"): idx for idx, line in enumerate(fh)}
+        self.lowercase = lowercase
+        self.unk_id = self.vocab.get(unk_token)
+        self.max_chars = max_chars
+
+    def _words(self, text):
+        if self.lowercase:
+            text = unicodedata.normalize("NFD", text.lower())
+            text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+        words = []
+        for chunk in text.split():
+            word = ""
+            for ch in chunk:
+                if (unicodedata.category(ch).startswith("P") or (ch.isascii() and not ch.isalnum())
+                        or _is_cjk(ord(ch))):
+                    if word:
+                        words.append(word)
+                    words.append(ch)
+                    word = ""
+                else:
+                    word += ch
+            if word:
+                words.append(word)
+        return words
+
+    def ids(self, text):
+        ids = []
+        for word in self._words(text):
+            if len(word) > self.max_chars:
+                ids.append(self.unk_id)
+                continue
+            pieces = []
+            start = 0
+            while start < len(word):
+                end = len(word)
+                while end > start:
+                    piece = word[start:end] if start == 0 else "##" + word[start:end]
+                    if piece in self.vocab:
+                        pieces.append(self.vocab[piece])
+                        break
+                    end -= 1
+                else:
+                    pieces = [self.unk_id]
+                    break
+                start = end
+            ids.extend(pieces)
+        return [i for i in ids if i is not None]
+
+
+class StaticEncoder:
+    name = "static"
+
+    def __init__(self, model_dir=STATIC_DIR):
+        with open(os.path.join(model_dir, "config.json"), "r", encoding="utf-8") as fh:
+            config = json.load(fh)
+        self.tokenizer = _WordPiece(
+            os.path.join(model_dir, "vocab.txt"), lowercase=config.get("do_lower_case", True)
+        )
+        # float16 on disk and memory-mapped: pages are shared between workers
+        self.table = np.load(os.path.join(model_dir, "embeddings.npy"), mmap_mode="r")
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.table.shape[1]), dtype=np.float32)
+        for row, text in enumerate(texts):
+            ids = self.tokenizer.ids(text)
+            if ids:
+                vectors[row] = self.table[ids].astype(np.float32).mean(axis=0)
+        return _normalize(vectors)
+
+
+def distill_static_embeddings(output_dir=STATIC_DIR, batch_size=512):
+    """Embed every vocabulary token once with the transformer (run once, offline).
+
+    Each token is run as ``[CLS] token [SEP]`` and mean-pooled like a full
+    sentence, so single-token phrases match the transformer exactly.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_ID, local_files_only=True)
+    model = AutoModel.from_pretrained(HF_MODEL_ID, local_files_only=True).eval()
+    vocab = sorted(tokenizer.get_vocab().items(), key=lambda item: item[1])
+    special = set(tokenizer.all_special_ids)
+
+    table = np.zeros((len(vocab), model.config.hidden_size), dtype=np.float32)
+    token_ids = [idx for _, idx in vocab if idx not in special]
+    with torch.no_grad():
+        for i in range(0, len(token_ids), batch_size):
+            batch = token_ids[i:i + batch_size]
+            input_ids = torch.tensor(
+                [[tokenizer.cls_token_id, idx, tokenizer.sep_token_id] for idx in batch]
+            )
+            hidden = model(input_ids=input_ids, attention_mask=torch.ones_like(input_ids)).last_hidden_state
+            table[batch] = hidden.mean(dim=1).numpy()
+
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, "embeddings.npy"), table.astype(np.float16))
+    with open(os.path.join(output_dir, "vocab.txt"), "w", encoding="utf-8") as fh:
+        fh.write("".join(token + "\n" for token, _ in vocab))
+    with open(os.path.join(output_dir, "config.json"), "w", encoding="utf-8") as fh:
+        json.dump({"source": HF_MODEL_ID, "do_lower_case": getattr(tokenizer, "do_lower_case", True)}, fh)
+    return output_dir
+
+
+def export_onnx_int8(output_dir=ONNX_INT8_DIR):
+    """Export the transformer to ONNX and quantize its weights to int8 (run once, offline)."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_ID, local_files_only=True)
+    model = AutoModel.from_pretrained(HF_MODEL_ID, local_files_only=True).eval()
+
+    class _Wrapper(torch.nn.Module):
+        # fixed positional signature, independent of the transformers forward()
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.inner(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            ).last_hidden_state
+
+    sample = tokenizer(["machine learning"], return_tensors="pt")
+
+    fp32_path = os.path.join(output_dir, "model-fp32.onnx")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            _Wrapper(model),
+            tuple(sample[name] for name in names),
+            fp32_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=14,
+            dynamo=False,
+        )
+    quantize_dynamic(fp32_path, os.path.join(output_dir, "model.onnx"), weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+    tokenizer.save_pretrained(output_dir)
+    return output_dir
+
+
+BACKENDS = {
+    TorchEncoder.name: TorchEncoder,
+    OnnxInt8Encoder.name: OnnxInt8Encoder,
+    StaticEncoder.name: StaticEncoder,
+}
+
+
+def load_encoder(backend=None):
+    """Instantiate the configured encoder backend."""
+    backend = backend or ENCODER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend {backend!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[backend]()
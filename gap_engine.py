@@ -1,33 +1,76 @@
 import re
 import json
+from taxonomy import get_taxonomy
+from skill_bitsets import normalize_skill, lexical_match
 from gen_ai_engine import (
     query_ollama, 
-    generate_learning_roadmap as gen_roadmap_ai,
+    cached_prompt,
+    parse_json_object,
+    roadmap_prompt,
+    roadmap_is_valid,
+    finish_roadmap,
+    mock_audit,
     ai_resume_audit as gen_audit_ai
 )
 
-def analyze_skill_gap(user_skills, job_skills):
-    if not job_skills:
-        return [], [], 0
-
-    # Fast lexical matcher to guarantee responsive processing.
-    user_lower = [s.lower().strip() for s in user_skills]
-    matched = []
-    for js in job_skills:
-        j = js.lower().strip()
-        if any(
-            j == u
-            or j in u
-            or u in j
-            or bool(set(j.split()) & set(u.split()))
-            for u in user_lower
-        ):
-            matched.append(js)
-
-    missing = [skill for skill in job_skills if skill not in matched]
-
-    match_score = (len(matched) / len(job_skills)) * 100
-
+MATCH_MODES = ("lexical", "semantic", "hybrid")
+SEMANTIC_THRESHOLD = 0.7
+
+def _semantic_scores(user_skills, job_skills, threshold):
+    # imported lazily: lexical callers never pay for loading the transformer stack
+    try:
+        from semantic_matcher import semantic_skill_scores
+    except ImportError as exc:
+        print("[gap_engine] warning: semantic matching unavailable:", exc)
+        return None
+    return semantic_skill_scores(user_skills, job_skills, threshold)
+
+def analyze_skill_gap(user_skills, job_skills, mode="lexical", threshold=None, with_scores=False):
+    """Compare user skills to job skills.
+
+    ``mode`` is "lexical" (interned-id bitsets), "semantic" (transformer
+    similarity above ``threshold``) or "hybrid" (lexical first, then the
+    transformer scores only the leftover job skills against the leftover
+    user skills). With ``with_scores=True`` a ``{job_skill: similarity}``
+    dict is returned as a fourth element; lexical hits score 1.0.
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {mode}")
+    threshold = SEMANTIC_THRESHOLD if threshold is None else threshold
+
+    # Skills are interned to ids; a job skill is matched when its bit is in the
+    # OR of the user skills' precomputed lexical-equivalence masks.
+    matched, missing, match_score = get_taxonomy().bitsets.gap(user_skills, job_skills)
+    skill_scores = {skill: 1.0 if skill in matched else 0.0 for skill in job_skills}
+
+    if mode == "semantic":
+        pending_jobs, pending_users = list(dict.fromkeys(job_skills)), list(user_skills)
+    elif mode == "hybrid":
+        matched_keys = [normalize_skill(s) for s in matched]
+        pending_jobs = list(dict.fromkeys(missing))
+        pending_users = [
+            u for u in user_skills
+            if not any(lexical_match(normalize_skill(u), j) for j in matched_keys)
+        ]
+    else:
+        pending_jobs = pending_users = []
+
+    if pending_jobs:
+        scores = _semantic_scores(pending_users, pending_jobs, threshold)
+        # without a local model the lexical result stands
+        if scores is not None:
+            if mode == "semantic":
+                matched = []
+            for skill, similarity in zip(pending_jobs, scores):
+                skill_scores[skill] = similarity
+                if similarity > threshold and skill not in matched:
+                    matched.append(skill)
+            matched = [skill for skill in job_skills if skill in matched]
+            missing = [skill for skill in job_skills if skill not in matched]
+            match_score = (len(matched) / len(job_skills)) * 100
+
+    if with_scores:
+        return matched, missing, match_score, skill_scores
     return matched, missing, match_score
 
 def calculate_career_readiness(resume_score, github_score):
@@ -168,20 +211,22 @@ def get_detailed_recommendations(missing_skills):
     return recommendations
 
 
-def generate_recommendations(missing_skills, role):
-    if not missing_skills:
-        return []
-        
-    prompt = f"""
+def recommendations_prompt(missing_skills, role):
+    return cached_prompt("recommendations", 1, f"""
     You are a Career Coach. The user wants to be a {role} but is missing these skills: {', '.join(missing_skills)}.
     
     Suggest 3 specific, hands-on projects they can build to learn these skills.
     
     Format:
     - [Project Name]: [Brief Description]
-    """
-    
-    response = query_ollama(prompt)
+    """, role=role, missing=missing_skills)
+
+def generate_recommendations(missing_skills, role):
+    if not missing_skills:
+        return []
+    return finish_recommendations(query_ollama(recommendations_prompt(missing_skills, role)), missing_skills)
+
+def finish_recommendations(response, missing_skills):
     if response:
         # Split by newlines and clean up
         lines = [line.strip() for line in response.split('\n') if line.strip() and (line.strip().startswith('-') or line.strip().startswith('*') or line.strip()[0].isdigit())]
@@ -250,8 +295,138 @@ def _roadmap_is_structured(text):
     return all(token in text for token in timeline_tokens) or all(token in text for token in week_tokens)
 
 
-def generate_learning_roadmap(missing_skills, role):
-    ai_roadmap = gen_roadmap_ai(missing_skills, role)
+def finish_learning_roadmap(response, missing_skills, role):
+    ai_roadmap = finish_roadmap(response, missing_skills, role)
     if _roadmap_is_structured(ai_roadmap):
         return ai_roadmap
     return _build_structured_roadmap(missing_skills, role)
+
+
+def generate_learning_roadmap(missing_skills, role):
+    return finish_learning_roadmap(query_ollama(roadmap_prompt(missing_skills, role)), missing_skills, role)
+
+
+def combined_prompt(missing_skills, role, resume_text, github_username=None, github_data=None):
+    from github_analyzer import github_profile_lines
+
+    github_block = ""
+    github_key = ""
+    if github_data:
+        github_block = f"""
+    GitHub profile of '{github_username}':
+    {github_profile_lines(github_data)}
+"""
+        github_key = """
+    "github_feedback": a markdown string reviewing ONLY the GitHub stats above: "**Assessment:** " followed by
+        a 3-sentence assessment of their engineering level (Junior/Mid/Senior/Expert), then "**Tips:**" and
+        2 numbered tips to improve profile visibility."""
+    prompt = cached_prompt("combined", 2, f"""
+    You are a senior career coach and technical recruiter. The candidate targets a {role} role.
+    Missing skills: {', '.join(missing_skills) if missing_skills else 'none'}.
+    Resume: "{resume_text[:1000]}..."
+    {github_block}
+    Return ONLY a JSON object with these keys:
+    "recommendations": an array of 3 strings, each "Project Name: brief description" of a hands-on project
+        that teaches the missing skills.
+    "roadmap": a markdown string with exactly these headings: "## Career Timeline Roadmap ({role})",
+        "### Goal", "### Step 1: Brief (Days 1-2)", "### Step 2: Sketch (Days 3-5)",
+        "### Step 3: Solution Sprint (Week 2)", "### Step 4: Design and Depth (Week 3)",
+        "### Step 5: Presentation (Week 4 - Part 1)", "### Step 6: Revision (Week 4 - Part 2)".
+        Every step has 2 concise action bullets and one line "**Output:** ...". Under 320 words.
+    "audit": a markdown string with 3 critical issues in the resume and 1 rewrite example.{github_key}
+    """, role=role, missing=missing_skills, resume=resume_text[:1000], github_username=github_username or "",
+        github=github_data or {})
+    # cache the reply only when every section it was asked for is usable
+    sections = _combined_sections(missing_skills, github_data)
+    prompt.validate = lambda text: _valid_combined(parse_json_object(text), sections)
+    return prompt
+
+
+def _valid_recommendations(value):
+    if not isinstance(value, list):
+        return None
+    recommendations = []
+    for item in value:
+        if isinstance(item, dict):
+            name = item.get("name") or item.get("title") or item.get("project")
+            description = item.get("description") or ""
+            item = f"{name}: {description}" if name else description
+        if isinstance(item, str) and item.strip():
+            recommendations.append(item.strip())
+    return recommendations or None
+
+
+def _valid_text(value, min_length=40):
+    return value.strip() if isinstance(value, str) and len(value.strip()) >= min_length else None
+
+
+def _valid_roadmap(value):
+    if isinstance(value, str) and roadmap_is_valid(value) and _roadmap_is_structured(value):
+        return value
+    return None
+
+
+COMBINED_VALIDATORS = {
+    "recommendations": _valid_recommendations,
+    "roadmap": _valid_roadmap,
+    "audit": _valid_text,
+    "github_feedback": _valid_text,
+}
+
+
+def _combined_sections(missing_skills, github_data):
+    sections = [name for name in COMBINED_VALIDATORS if name != "github_feedback" or github_data]
+    return [name for name in sections if name != "recommendations" or missing_skills]
+
+
+def _valid_combined(data, sections):
+    return data is not None and all(COMBINED_VALIDATORS[name](data.get(name)) is not None for name in sections)
+
+
+def generate_ai_analysis(missing_skills, role, resume_text, github_username=None, github_data=None, retry=True):
+    """Recommendations, roadmap, resume audit and GitHub feedback from one JSON-mode request.
+
+    Each section of the reply is validated on its own. A section that fails
+    is regenerated with its own prompt when ``retry`` is set and Ollama did
+    answer; otherwise (or if Ollama is unavailable) it falls back to its
+    mock generator. ``github_feedback`` is only produced with ``github_data``,
+    and ``recommendations`` only when skills are missing.
+    Returns the sections plus ``sources``: {section: "combined" | "retried" | "fallback"}.
+    """
+    from github_analyzer import analyze_github_with_ai, finish_github_feedback
+
+    response = query_ollama(
+        combined_prompt(missing_skills, role, resume_text, github_username, github_data), json_mode=True
+    )
+    data = parse_json_object(response) or {}
+
+    sections = {
+        "recommendations": (
+            lambda: generate_recommendations(missing_skills, role),
+            lambda: get_detailed_recommendations(missing_skills),
+        ),
+        "roadmap": (
+            lambda: generate_learning_roadmap(missing_skills, role),
+            lambda: finish_learning_roadmap(None, missing_skills, role),
+        ),
+        "audit": (
+            lambda: ai_resume_audit(resume_text, role),
+            lambda: mock_audit(role),
+        ),
+        "github_feedback": (
+            lambda: analyze_github_with_ai(github_username, github_data),
+            lambda: finish_github_feedback(None),
+        ),
+    }
+
+    result = {"recommendations": [], "github_feedback": None, "sources": {}}
+    for section in _combined_sections(missing_skills, github_data):
+        regenerate, fallback = sections[section]
+        value = COMBINED_VALIDATORS[section](data.get(section))
+        if value is not None:
+            result[section], result["sources"][section] = value, "combined"
+        elif retry and response is not None:
+            result[section], result["sources"][section] = regenerate(), "retried"
+        else:
+            result[section], result["sources"][section] = fallback(), "fallback"
+    return result
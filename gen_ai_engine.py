@@ -1,38 +1,480 @@
-import requests
+import hashlib
 import json
+import os
 import random
+import re
+import sqlite3
+import threading
+import time
 from datetime import date
 
-OLLAMA_API_URL = "http://localhost:11434/api/generate"
+import requests
+from requests.adapters import HTTPAdapter
+
+from taxonomy import BASE_DIR
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
+OLLAMA_API_URL = OLLAMA_BASE_URL + "/api/generate"
+OLLAMA_TAGS_URL = OLLAMA_BASE_URL + "/api/tags"
 MODEL_NAME = "llama3.2:3b"
+OLLAMA_TIMEOUT = 25
+# background health poll period, and the timeout of each poll
+OLLAMA_HEALTH_INTERVAL = float(os.environ.get("OLLAMA_HEALTH_INTERVAL", "5"))
+OLLAMA_HEALTH_TIMEOUT = 1
+# consecutive failures that open the breaker, and how long it stays open before a probe
+OLLAMA_BREAKER_FAILURES = int(os.environ.get("OLLAMA_BREAKER_FAILURES", "2"))
+OLLAMA_BREAKER_COOLDOWN = float(os.environ.get("OLLAMA_BREAKER_COOLDOWN", "30"))
+# a half-open probe that has not settled by then is given up and another one let through
+OLLAMA_BREAKER_PROBE_TIMEOUT = float(os.environ.get("OLLAMA_BREAKER_PROBE_TIMEOUT", str(2 * OLLAMA_TIMEOUT)))
+# persistent generation cache: entries expire after the TTL, and the least
+# recently used are evicted once the stored responses exceed the size bound
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(BASE_DIR, "data", "llm_cache.db"))
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    """One keep-alive connection pool shared by every Ollama call."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+    return _session
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failures`` consecutive errors -> half-open after ``cooldown``.
+
+    While open every call is refused at once (callers use their mock
+    generator). Once the cooldown has passed a single call is let through
+    as a probe: success closes the breaker, failure opens it again. A probe
+    that never reports back is replaced after ``probe_timeout``.
+    """
 
-def check_ollama_status():
-    """Checks if Ollama is running and the model is available."""
-    try:
-        response = requests.get("http://localhost:11434/api/tags", timeout=1)
-        if response.status_code == 200:
-            return True
-    except:
+    def __init__(self, failures=OLLAMA_BREAKER_FAILURES, cooldown=OLLAMA_BREAKER_COOLDOWN,
+                 probe_timeout=OLLAMA_BREAKER_PROBE_TIMEOUT):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.time()
+            if (self.state == "open" and now - self.opened_at >= self.cooldown) or (
+                self.state == "half_open" and now - self.probe_started_at >= self.probe_timeout
+            ):
+                self.state = "half_open"
+                self.probe_started_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.max_failures:
+                self.trip()
+
+    def trip(self):
+        # callers hold the lock
+        self.state = "open"
+        self.opened_at = time.time()
+
+    def health_changed(self, healthy):
+        """Let the health poller open the breaker, or on recovery let the next call probe at once."""
+        with self._lock:
+            if not healthy and self.state == "closed":
+                self.failures = self.max_failures
+                self.trip()
+            elif healthy and self.state == "open":
+                self.opened_at = 0.0
+            elif healthy and self.state == "half_open":
+                # the probe in flight may never report back; don't wait for it
+                self.probe_started_at = 0.0
+
+    def status(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+class OllamaHealth:
+    """Polls ``/api/tags`` on a daemon thread; readers only ever see the cached result."""
+
+    def __init__(self, breaker, interval=OLLAMA_HEALTH_INTERVAL):
+        self.breaker = breaker
+        self.interval = interval
+        self.healthy = False
+        self.models = []
+        self.checked_at = None
+        self.latency_ms = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def check(self):
+        start = time.perf_counter()
+        try:
+            response = _get_session().get(OLLAMA_TAGS_URL, timeout=OLLAMA_HEALTH_TIMEOUT)
+            healthy = response.status_code == 200
+            models = [m.get("name") for m in response.json().get("models", [])] if healthy else []
+        except (requests.RequestException, ValueError):
+            healthy, models = False, []
+        with self._lock:
+            self.healthy = healthy
+            self.models = models
+            self.checked_at = time.time()
+            self.latency_ms = (time.perf_counter() - start) * 1000
+        self.breaker.health_changed(healthy)
+        return healthy
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+    def start(self):
+        """Run the first check inline, then keep polling in the background (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="ollama-health", daemon=True)
+        self.check()
+        self._thread.start()
+
+    def status(self):
+        self.start()
+        with self._lock:
+            return {
+                "healthy": self.healthy,
+                "model": MODEL_NAME,
+                "model_available": any(m == MODEL_NAME or m.split(":")[0] == MODEL_NAME for m in self.models),
+                "models": list(self.models),
+                "checked_at": self.checked_at,
+                "latency_ms": self.latency_ms,
+            }
+
+
+_breaker = CircuitBreaker()
+_health = OllamaHealth(_breaker)
+
+
+class LLMPrompt(str):
+    """A prompt that carries the cache key of its template and normalized inputs.
+
+    ``validate``, when set, returns a truthy value for a usable response;
+    only such responses are cached or served from the cache.
+    """
+
+    cache_key = None
+    validate = None
+
+
+# inputs whose case, spacing and order do not change the answer
+FOLDED_INPUTS = ("role", "missing", "matched")
+
+
+def _fold(value):
+    # a role name or a set of skill names: case, whitespace and order are irrelevant
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sorted({_fold(v) for v in value if isinstance(v, str)})
+    return value
+
+
+def cached_prompt(template, version, text, **inputs):
+    """Tag prompt ``text`` with a key built from the model, ``template``, ``version`` and ``inputs``.
+
+    Only the inputs named in ``FOLDED_INPUTS`` are normalized; everything
+    else (names, resume text, profiles) is keyed verbatim. Bump ``version``
+    whenever the template wording or its inputs change, so responses to the
+    old wording stop being served.
+    """
+    prompt = LLMPrompt(text)
+    inputs = {name: _fold(value) if name in FOLDED_INPUTS else value for name, value in inputs.items()}
+    key = {"model": MODEL_NAME, "template": template, "version": version, "inputs": inputs}
+    prompt.cache_key = template + ":" + hashlib.sha256(
+        json.dumps(key, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return prompt
+
+
+def _usable(prompt, text, json_mode=False):
+    """Whether ``text`` may be cached for ``prompt`` (a JSON-mode reply must at least parse)."""
+    if not text:
         return False
-    return False
+    validate = getattr(prompt, "validate", None)
+    if validate is None and json_mode:
+        validate = parse_json_object
+    return validate is None or bool(validate(text))
+
+
+def _prompt_key(prompt):
+    # untagged prompts are keyed by their exact text
+    key = getattr(prompt, "cache_key", None)
+    if key:
+        return key
+    return "raw:" + hashlib.sha256(f"{MODEL_NAME}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite store of Ollama responses keyed by :func:`cached_prompt` keys.
 
-def query_ollama(prompt):
+    Shared by the blocking and streaming paths and by every entry point
+    (Streamlit, API, scripts). ``eval_count`` (tokens Ollama generated) is
+    stored with each response, so a hit reports the tokens it saved.
     """
-    Queries the local Ollama instance. Returns None if it fails.
+
+    def __init__(self, path=None, ttl=None, max_bytes=None):
+        self.path = path or LLM_CACHE_PATH
+        self.ttl = LLM_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_bytes = LLM_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS generations (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                eval_count INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS generations_last_used ON generations (last_used);
+        """)
+        self._conn.commit()
+        self.hits = self.misses = self.tokens_saved = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, eval_count, created_at FROM generations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[2] > self.ttl:
+                self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE generations SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            self.tokens_saved += row[1]
+            return row[0]
+
+    def put(self, key, response, eval_count=0):
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO generations (key, response, eval_count, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response, int(eval_count or 0), size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        # callers hold the lock
+        self._conn.execute("DELETE FROM generations WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM generations ORDER BY last_used"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            entries, size, lifetime_hits, lifetime_saved = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0), "
+                "COALESCE(SUM(hits * eval_count), 0) FROM generations"
+            ).fetchone()
+            hits, misses, saved = self.hits, self.misses, self.tokens_saved
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "tokens_saved": saved,
+            "entries": entries,
+            "bytes": size,
+            # over the entries still stored, across processes
+            "stored_hits": lifetime_hits,
+            "stored_tokens_saved": lifetime_saved,
+        }
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache()
+    return _llm_cache
+
+
+def llm_cache_stats():
+    """Hit ratio and generated tokens saved by the LLM response cache."""
+    return get_llm_cache().stats()
+
+
+def ollama_status():
+    """Cached health of the Ollama backend plus the circuit breaker state (no request is made)."""
+    status = _health.status()
+    status["breaker"] = _breaker.status()
+    return status
+
+
+def check_ollama_status():
+    """Checks if Ollama is running, from the background poller's cached result."""
+    return ollama_status()["healthy"]
+
+
+def query_ollama(prompt, json_mode=False):
     """
+    Queries the local Ollama instance, through the response cache. Returns
+    None if it fails, or at once while the circuit breaker is open.
+    ``json_mode`` asks Ollama to constrain the output to valid JSON.
+    Only responses that pass the prompt's validator are cached.
+    """
+    cache = get_llm_cache()
+    key = _prompt_key(prompt)
+    cached = cache.get(key)
+    if cached is not None and _usable(prompt, cached, json_mode):
+        return cached
+    _health.start()
+    if not _breaker.allow():
+        return None
     try:
-        response = requests.post(OLLAMA_API_URL, json={
+        payload = {
             "model": MODEL_NAME,
             "prompt": prompt,
             "stream": False
-        }, timeout=25)
+        }
+        if json_mode:
+            payload["format"] = "json"
+        response = _get_session().post(OLLAMA_API_URL, json=payload, timeout=OLLAMA_TIMEOUT)
         
         if response.status_code == 200:
-            return response.json().get("response", "")
+            _breaker.success()
+            data = response.json()
+            text = data.get("response", "")
+            if _usable(prompt, text, json_mode):
+                cache.put(key, text, data.get("eval_count", 0))
+            return text
+        _breaker.failure()
+        return None
+    except Exception as e:
+        _breaker.failure()
+        print(f"Ollama Error: {e}")
         return None
+
+
+def stream_ollama(prompt):
+    """
+    Yields response tokens from Ollama's NDJSON stream as they are generated.
+    A cached response is yielded whole, and a completed stream that passes the
+    prompt's validator is cached.
+    Yields nothing if Ollama fails before the first token or the breaker is open.
+    """
+    cache = get_llm_cache()
+    key = _prompt_key(prompt)
+    cached = cache.get(key)
+    if cached is not None and _usable(prompt, cached):
+        yield cached
+        return
+    _health.start()
+    if not _breaker.allow():
+        return
+    received = False
+    parts = []
+    try:
+        with _get_session().post(OLLAMA_API_URL, json={
+            "model": MODEL_NAME,
+            "prompt": prompt,
+            "stream": True
+        }, stream=True, timeout=(OLLAMA_HEALTH_TIMEOUT * 5, OLLAMA_TIMEOUT)) as response:
+            if response.status_code != 200:
+                _breaker.failure()
+                return
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise ValueError(chunk["error"])
+                token = chunk.get("response", "")
+                if token:
+                    if not received:
+                        # the backend is answering; settle a half-open probe now in case
+                        # the consumer stops reading before the end
+                        received = True
+                        _breaker.success()
+                    parts.append(token)
+                    yield token
+                if chunk.get("done"):
+                    text = "".join(parts)
+                    if _usable(prompt, text):
+                        cache.put(key, text, chunk.get("eval_count", 0))
+                    break
+        if not received:
+            _breaker.success()
     except Exception as e:
+        _breaker.failure()
         print(f"Ollama Error: {e}")
+
+
+def parse_json_object(response):
+    """The JSON object in ``response`` (markdown fences and surrounding text allowed), or None."""
+    if not response:
         return None
+    cleaned = response.replace("```json", "").replace("```", "").strip()
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        start, end = cleaned.find("{"), cleaned.rfind("}")
+        if start < 0 or end <= start:
+            return None
+        try:
+            data = json.loads(cleaned[start:end + 1])
+        except ValueError:
+            return None
+    return data if isinstance(data, dict) else None
 
 
 # --- MOCK GENERATORS (FALLBACKS) ---
@@ -135,50 +577,60 @@ def mock_audit(role):
 
 
 # --- MAIN FUNCTIONS with FALLBACKS ---
+# Each generator is a prompt builder plus a finisher that validates the raw
+# response and falls back to its mock, so the blocking functions and the
+# streaming paths (stream_ollama) produce the same final result.
 
-def generate_cover_letter(user_name, company_name, role, matched_skills, missing_skills):
-    """
-    Generates a tailored cover letter using AI with a fallback.
-    """
-    prompt = f"""
+def cover_letter_prompt(user_name, company_name, role, matched_skills, missing_skills):
+    return cached_prompt("cover_letter", 2, f"""
     Write a professional cover letter for {user_name} applying for {role} at {company_name}.
     Highlight these skills: {', '.join(matched_skills)}.
     Mention learning these: {', '.join(missing_skills)}.
     Keep it under 300 words.
-    """
-    
-    response = query_ollama(prompt)
+    """, user_name=user_name, company_name=company_name, role=role, matched=matched_skills, missing=missing_skills)
+
+def finish_cover_letter(response, user_name, company_name, role, matched_skills):
     if response:
         return response
-        
     return mock_cover_letter(user_name, company_name, role, matched_skills)
 
+def generate_cover_letter(user_name, company_name, role, matched_skills, missing_skills):
+    """
+    Generates a tailored cover letter using AI with a fallback.
+    """
+    response = query_ollama(cover_letter_prompt(user_name, company_name, role, matched_skills, missing_skills))
+    return finish_cover_letter(response, user_name, company_name, role, matched_skills)
+
 def generate_interview_questions(role, missing_skills):
     """
     Generates interview questions using AI with a fallback.
     """
-    prompt = f"""
+    prompt = cached_prompt("interview_questions", 1, f"""
     Generate 3 interview questions for a {role}.
     Focus on: {', '.join(missing_skills)}.
     Return ONLY a raw JSON array (no markdown) with objects having 'type', 'question', 'tip'.
-    """
-    
-    response = query_ollama(prompt)
-    if response:
-        try:
-            # Clean possible markdown wrapping
-            cleaned = response.replace("```json", "").replace("```", "").strip()
-            return json.loads(cleaned)
-        except:
-            pass
-            
+    """, role=role, missing=missing_skills)
+    prompt.validate = parse_interview_questions
+
+    questions = parse_interview_questions(query_ollama(prompt))
+    if questions:
+        return questions
     return mock_interview_questions(role, missing_skills)
 
-def generate_learning_roadmap(missing_skills, role):
-    """
-    Generates a timeline-style roadmap using AI with a fallback.
-    """
-    prompt = f"""
+def parse_interview_questions(response):
+    """The JSON array of questions in ``response`` (markdown fences allowed), or None."""
+    if not response:
+        return None
+    # Clean possible markdown wrapping
+    cleaned = response.replace("```json", "").replace("```", "").strip()
+    try:
+        data = json.loads(cleaned)
+    except ValueError:
+        return None
+    return data if isinstance(data, list) else None
+
+def roadmap_prompt(missing_skills, role):
+    prompt = cached_prompt("roadmap", 1, f"""
     You are a senior career coach.
     Create a strict, structured career timeline roadmap for a {role}.
     Missing skills: {', '.join(missing_skills)}.
@@ -199,27 +651,38 @@ def generate_learning_roadmap(missing_skills, role):
       - 1 output line in format: **Output:** ...
     - Provide practical, role-specific tasks with measurable outputs.
     - Keep total response under 320 words.
-    """
-    
-    response = query_ollama(prompt)
-    if response and "Step 1" in response and "Step 6" in response and "**Output:**" in response:
+    """, role=role, missing=missing_skills)
+    prompt.validate = roadmap_is_valid
+    return prompt
+
+def roadmap_is_valid(response):
+    return bool(response) and "Step 1" in response and "Step 6" in response and "**Output:**" in response
+
+def finish_roadmap(response, missing_skills, role):
+    if roadmap_is_valid(response):
         return response
-        
     return mock_roadmap(missing_skills, role)
 
-def ai_resume_audit(resume_text, role):
+def generate_learning_roadmap(missing_skills, role):
     """
-    Audits the resume using AI with a fallback.
+    Generates a timeline-style roadmap using AI with a fallback.
     """
-    prompt = f"""
+    return finish_roadmap(query_ollama(roadmap_prompt(missing_skills, role)), missing_skills, role)
+
+def audit_prompt(resume_text, role):
+    return cached_prompt("audit", 2, f"""
     Audit this resume for a {role}.
     Resume: "{resume_text[:1000]}..."
     Provide 3 critical issues and 1 rewrite.
-    """
-    
-    response = query_ollama(prompt)
+    """, role=role, resume=resume_text[:1000])
+
+def finish_audit(response, role):
     if response:
         return response
-        
     return mock_audit(role)
 
+def ai_resume_audit(resume_text, role):
+    """
+    Audits the resume using AI with a fallback.
+    """
+    return finish_audit(query_ollama(audit_prompt(resume_text, role)), role)
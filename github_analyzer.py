@@ -1,30 +1,401 @@
-import requests
-from gen_ai_engine import query_ollama
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
 
-GITHUB_API_URL = "https://api.github.com/users/"
+import httpx
 
-def analyze_github_profile(username):
-    user_url = GITHUB_API_URL + username
-    repos_url = user_url + "/repos"
+from taxonomy import BASE_DIR
+from gen_ai_engine import query_ollama, cached_prompt
+
+GITHUB_API_BASE = os.environ.get("GITHUB_API_BASE", "https://api.github.com").rstrip("/")
+GITHUB_API_URL = GITHUB_API_BASE + "/users/"
+GITHUB_GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", GITHUB_API_BASE + "/graphql")
+# "auto" uses GraphQL whenever a token is configured (the GraphQL API requires one)
+GITHUB_BACKEND = os.environ.get("GITHUB_BACKEND", "auto")
+GITHUB_TIMEOUT = 6
+REPOS_PER_PAGE = 100
+PAGE_CONCURRENCY = 4
+LANGUAGE_CONCURRENCY = int(os.environ.get("GITHUB_LANGUAGE_CONCURRENCY", "8"))
+MEMBER_CONCURRENCY = int(os.environ.get("GITHUB_MEMBER_CONCURRENCY", "8"))
+TEAM_MAX_MEMBERS = int(os.environ.get("GITHUB_TEAM_MAX_MEMBERS", "200"))
+GITHUB_CACHE_PATH = os.environ.get("GITHUB_CACHE_PATH", os.path.join(BASE_DIR, "data", "github_cache.db"))
+# cached responses younger than this are served without even a conditional request
+GITHUB_CACHE_FRESH_SECONDS = float(os.environ.get("GITHUB_CACHE_FRESH_SECONDS", "60"))
+# comma-separated personal access tokens, rotated by remaining budget
+GITHUB_TOKENS = [
+    t.strip() for t in os.environ.get("GITHUB_TOKENS", os.environ.get("GITHUB_TOKEN", "")).split(",") if t.strip()
+]
+# requests kept in reserve per token, and how long a caller may wait for a reset
+GITHUB_RATE_RESERVE = int(os.environ.get("GITHUB_RATE_RESERVE", "2"))
+GITHUB_MAX_QUEUE_SECONDS = float(os.environ.get("GITHUB_MAX_QUEUE_SECONDS", "10"))
+
+# one keep-alive pool per event loop (an AsyncClient cannot cross loops)
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+# sync callers share a single background loop, and so a single pool
+_sync_loop = None
+_sync_loop_lock = threading.Lock()
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+# identical requests already on the wire, per event loop: {loop: {key: task}}
+_inflight = weakref.WeakKeyDictionary()
+
+
+class RateLimited(Exception):
+    """Every token is out of budget for longer than callers are willing to wait."""
+
+
+class GraphQLError(Exception):
+    """The GraphQL API answered without usable data."""
+
+
+class RateLimitBucket:
+    """Request budget of one token, as last reported by ``X-RateLimit-*`` headers."""
+
+    def __init__(self, token=None):
+        self.token = token
+        # GitHub's documented defaults until the first response says otherwise
+        self.limit = 5000 if token else 60
+        self.remaining = self.limit
+        self.reset_at = 0.0
+
+    def refill(self, now):
+        if self.reset_at and now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = 0.0
+
+    def update(self, headers):
+        try:
+            self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.reset_at = float(headers.get("X-RateLimit-Reset", self.reset_at))
+        except (KeyError, ValueError):
+            pass
+
+
+class GitHubScheduler:
+    """Token-bucket admission for GitHub requests across a pool of tokens.
+
+    ``acquire`` takes one request from the token with the most budget left.
+    When every token is down to ``GITHUB_RATE_RESERVE`` it returns the wait
+    until the earliest reset instead.
+    """
+
+    def __init__(self, tokens=None):
+        self.buckets = [RateLimitBucket(t) for t in (tokens or [None])]
+        self._lock = threading.Lock()
+        self.coalesced = self.queued = self.degraded = 0
+
+    def acquire(self):
+        with self._lock:
+            now = time.time()
+            for bucket in self.buckets:
+                bucket.refill(now)
+            bucket = max(self.buckets, key=lambda b: b.remaining)
+            if bucket.remaining > GITHUB_RATE_RESERVE:
+                bucket.remaining -= 1
+                return bucket, 0.0
+            resets = [b.reset_at for b in self.buckets if b.reset_at]
+            return None, (min(resets) - now if resets else GITHUB_MAX_QUEUE_SECONDS + 1)
+
+    def update(self, bucket, response):
+        with self._lock:
+            bucket.update(response.headers)
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def status(self):
+        with self._lock:
+            return {
+                "tokens": [
+                    {
+                        "token": f"...{b.token[-4:]}" if b.token else None,
+                        "remaining": b.remaining,
+                        "limit": b.limit,
+                        "reset_at": b.reset_at or None,
+                    }
+                    for b in self.buckets
+                ],
+                "coalesced": self.coalesced,
+                "queued": self.queued,
+                "degraded": self.degraded,
+            }
+
+
+_scheduler = GitHubScheduler(GITHUB_TOKENS)
+# GraphQL has its own point budget per token, reported by its own headers
+_graphql_scheduler = GitHubScheduler(GITHUB_TOKENS)
+
+
+def github_rate_limit_status():
+    """Per-token budget plus coalesced / queued / degraded request counts."""
+    status = _scheduler.status()
+    if _use_graphql():
+        status["graphql"] = _graphql_scheduler.status()
+    return status
+
+
+class GitHubHttpCache:
+    """SQLite store of GitHub response bodies with their validators.
+
+    Expired entries are revalidated with ``If-None-Match`` /
+    ``If-Modified-Since``; GitHub answers an unchanged resource with a 304,
+    which does not count against the rate limit.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or GITHUB_CACHE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                link TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS repo_languages (
+                full_name TEXT PRIMARY KEY,
+                pushed_at TEXT NOT NULL,
+                languages TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS user_snapshots (
+                username TEXT PRIMARY KEY,
+                newest_updated_at TEXT NOT NULL,
+                repos TEXT NOT NULL,
+                saved_at REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self.hits = self.revalidated = self.misses = 0
+
+    def get(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, link, body, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    def put(self, url, response):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, link, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    response.headers.get("Link"),
+                    response.content,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def get_languages(self, repos):
+        """``{full_name: byte counts}`` for the ``(full_name, pushed_at)`` pairs not pushed to since."""
+        pushed = dict(repos)
+        names = list(pushed)
+        found = {}
+        with self._lock:
+            for i in range(0, len(names), 500):
+                chunk = names[i:i + 500]
+                for full_name, pushed_at, languages in self._conn.execute(
+                    "SELECT full_name, pushed_at, languages FROM repo_languages "
+                    f"WHERE full_name IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    if pushed[full_name] == pushed_at:
+                        found[full_name] = json.loads(languages)
+        return found
+
+    def put_languages(self, entries):
+        """Store ``(full_name, pushed_at, byte counts)`` entries in one transaction."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO repo_languages (full_name, pushed_at, languages) VALUES (?, ?, ?)",
+                [(full_name, pushed_at, json.dumps(languages)) for full_name, pushed_at, languages in entries],
+            )
+            self._conn.commit()
+
+    def get_snapshot(self, username):
+        """``(newest_updated_at, {full_name: repo record})`` from the last sync, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT newest_updated_at, repos FROM user_snapshots WHERE username = ?", (username.lower(),)
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def put_snapshot(self, username, repos):
+        newest = max((r.get("updated_at") or "" for r in repos.values()), default="")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_snapshots (username, newest_updated_at, repos, saved_at) "
+                "VALUES (?, ?, ?, ?)",
+                (username.lower(), newest, json.dumps(repos), time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url):
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+    def record(self, outcome):
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+            ).fetchone()
+            hits, revalidated, misses = self.hits, self.revalidated, self.misses
+        total = hits + revalidated + misses
+        return {
+            "hits": hits,
+            "revalidated": revalidated,
+            "misses": misses,
+            "hit_ratio": (hits + revalidated) / total if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
 
+
+def get_http_cache():
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = GitHubHttpCache()
+    return _http_cache
+
+
+def github_cache_stats():
+    """Hit / revalidate / miss counts of the GitHub response cache (this process)."""
+    return get_http_cache().stats()
+
+
+def _cached_response(url, row):
+    _, _, link, body, _ = row
+    headers = {"Content-Type": "application/json"}
+    if link:
+        headers["Link"] = link
+    return httpx.Response(200, content=body, headers=headers, request=httpx.Request("GET", url))
+
+
+async def _scheduled_request(client, url, headers, payload=None, scheduler=None):
+    """Send a request once the rate-limit budget allows it, rotating tokens on exhaustion.
+
+    A GET, or a POST of ``payload`` as JSON when one is given.
+    """
+    scheduler = scheduler or _scheduler
+    for _ in range(len(scheduler.buckets) + 2):
+        bucket, wait = scheduler.acquire()
+        if bucket is None:
+            if wait > GITHUB_MAX_QUEUE_SECONDS:
+                raise RateLimited(f"GitHub rate limit resets in {wait:.0f}s")
+            scheduler.record("queued")
+            await asyncio.sleep(max(wait, 0.05))
+            continue
+        request_headers = dict(headers)
+        if bucket.token:
+            request_headers["Authorization"] = f"Bearer {bucket.token}"
+        if payload is None:
+            response = await client.get(url, headers=request_headers)
+        else:
+            response = await client.post(url, headers=request_headers, json=payload)
+        scheduler.update(bucket, response)
+        if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+            continue
+        return response
+    raise RateLimited("GitHub rate limit exhausted")
+
+
+async def _shared_flight(key, start, scheduler=None):
+    """Await ``start()``, or the flight of an identical call already running on this loop."""
+    with _clients_lock:
+        flights = _inflight.setdefault(asyncio.get_running_loop(), {})
+    task = flights.get(key)
+    if task is not None:
+        (scheduler or _scheduler).record("coalesced")
+        return await asyncio.shield(task)
+    task = flights[key] = asyncio.ensure_future(start())
+    task.add_done_callback(lambda _: flights.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def _cached_get(client, url, params=None):
+    """GET through the on-disk cache, sharing one flight between identical concurrent calls."""
+    url = str(httpx.URL(url, params=params) if params else httpx.URL(url))
+    return await _shared_flight(url, lambda: _fetch_cached(client, url))
+
+
+async def _fetch_cached(client, url):
+    """A 304 is answered with the stored body; when rate limited, a stale copy is served."""
+    cache = get_http_cache()
+    row = await asyncio.to_thread(cache.get, url)
+    if row is not None and time.time() - row[4] < GITHUB_CACHE_FRESH_SECONDS:
+        cache.record("hits")
+        return _cached_response(url, row)
+
+    headers = {}
+    if row is not None:
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
     try:
-        user_response = requests.get(user_url, timeout=6)
-        repos_response = requests.get(repos_url, timeout=6)
-    except requests.RequestException:
-        return None
+        response = await _scheduled_request(client, url, headers)
+    except RateLimited:
+        if row is None:
+            raise
+        _scheduler.record("degraded")
+        return _cached_response(url, row)
 
-    if user_response.status_code != 200:
-        return None
+    if response.status_code == 304 and row is not None:
+        await asyncio.to_thread(cache.touch, url)
+        cache.record("revalidated")
+        return _cached_response(url, row)
+    cache.record("misses")
+    if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+        await asyncio.to_thread(cache.put, url, response)
+    return response
+
+
+def _get_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(loop)
+            if client is None:
+                client = _clients[loop] = httpx.AsyncClient(
+                    timeout=GITHUB_TIMEOUT,
+                    headers={"Accept": "application/vnd.github+json"},
+                    limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                )
+    return client
 
-    user_data = user_response.json()
-    repos_data = repos_response.json() if repos_response.status_code == 200 else []
-    if not isinstance(repos_data, list):
-        repos_data = []
 
+def _summarize(user_data, repos_data, language_bytes=None):
     total_repos = user_data.get("public_repos", 0)
     followers = user_data.get("followers", 0)
 
     languages = {}
+    topics = {}
     total_stars = 0
 
     for repo in repos_data:
@@ -35,25 +406,476 @@ def analyze_github_profile(username):
 
         if lang:
             languages[lang] = languages.get(lang, 0) + 1
+        for topic in repo.get("topics") or []:
+            topics[topic] = topics.get(topic, 0) + 1
 
-    return {
+    summary = {
         "total_repos": total_repos,
         "followers": followers,
         "languages": languages,
-        "total_stars": total_stars
+        "total_stars": total_stars,
+        "topics": dict(sorted(topics.items(), key=lambda item: -item[1])),
     }
+    if language_bytes is not None:
+        total_bytes = sum(language_bytes.values())
+        ranked = sorted(language_bytes.items(), key=lambda item: -item[1])
+        summary["language_bytes"] = dict(ranked)
+        summary["language_shares"] = {
+            lang: round(size / total_bytes, 4) for lang, size in ranked
+        } if total_bytes else {}
+    return summary
 
-def analyze_github_with_ai(username, profile_data):
+
+async def _fetch_language_bytes(client, repos_data):
+    """Sum ``/repos/{owner}/{repo}/languages`` byte counts over every repo.
+
+    At most ``LANGUAGE_CONCURRENCY`` requests run at once, and a repo whose
+    ``pushed_at`` matches the stored one is not requested at all.
     """
-    Sends GitHub stats to Llama 3 for a qualitative recruiter review.
+    cache = get_http_cache()
+    semaphore = asyncio.Semaphore(LANGUAGE_CONCURRENCY)
+    repos_data = [repo for repo in repos_data if repo.get("full_name")]
+    stored = await asyncio.to_thread(
+        cache.get_languages, [(repo["full_name"], repo.get("pushed_at") or "") for repo in repos_data]
+    )
+    fetched = []
+
+    async def languages_of(repo):
+        full_name = repo["full_name"]
+        if full_name in stored:
+            return stored[full_name]
+        async with semaphore:
+            response = await _cached_get(client, f"{GITHUB_API_BASE}/repos/{full_name}/languages")
+        if response.status_code != 200:
+            return {}
+        languages = response.json()
+        if not isinstance(languages, dict):
+            return {}
+        fetched.append((full_name, repo.get("pushed_at") or "", languages))
+        return languages
+
+    totals = {}
+    for languages in await asyncio.gather(*(languages_of(repo) for repo in repos_data)):
+        for lang, size in languages.items():
+            totals[lang] = totals.get(lang, 0) + int(size)
+    if fetched:
+        await asyncio.to_thread(cache.put_languages, fetched)
+    return totals
+
+
+def _json_list(response):
+    data = response.json() if response.status_code == 200 else []
+    return data if isinstance(data, list) else []
+
+
+async def _fetch_pages(client, first_page):
+    """Collect every page of a list endpoint, starting from an already-fetched first page.
+
+    When the ``Link`` header names the last page the remaining pages are
+    fetched concurrently (at most ``PAGE_CONCURRENCY`` at a time); otherwise
+    ``rel="next"`` links are followed one by one.
+    """
+    repos = _json_list(first_page)
+    if first_page.status_code != 200:
+        return repos
+
+    last_url = first_page.links.get("last", {}).get("url")
+    if last_url:
+        last_url = httpx.URL(last_url)
+        last_page = int(last_url.params.get("page", "1"))
+        semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+        async def fetch(page):
+            async with semaphore:
+                return await _cached_get(client, last_url.copy_set_param("page", page))
+
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+        for response in pages:
+            repos.extend(_json_list(response))
+        return repos
+
+    next_url = first_page.links.get("next", {}).get("url")
+    while next_url:
+        response = await _cached_get(client, next_url)
+        repos.extend(_json_list(response))
+        next_url = response.links.get("next", {}).get("url") if response.status_code == 200 else None
+    return repos
+
+
+async def _fetch_repos_since(client, first_page, cutoff):
+    """Repos updated at or after ``cutoff``, from pages sorted by ``updated`` (newest first).
+
+    Stops paginating at the first page that reaches older repos.
+    """
+    response = first_page
+    page = _json_list(response)
+    changed = []
+    while page:
+        fresh = [repo for repo in page if (repo.get("updated_at") or "") >= cutoff]
+        changed.extend(fresh)
+        next_url = response.links.get("next", {}).get("url") if response.status_code == 200 else None
+        if len(fresh) < len(page) or not next_url:
+            break
+        response = await _cached_get(client, next_url)
+        page = _json_list(response)
+    return changed
+
+
+def _repo_record(repo):
+    # the fields the summaries need, so snapshots stay small
+    return {
+        "full_name": repo.get("full_name") or repo.get("name"),
+        "language": repo.get("language"),
+        "stargazers_count": repo.get("stargazers_count", 0),
+        "pushed_at": repo.get("pushed_at"),
+        "updated_at": repo.get("updated_at"),
+        "topics": repo.get("topics") or [],
+    }
+
+
+GRAPHQL_PROFILE_QUERY = """
+query($login: String!, $cursor: String, $languages: Boolean!) {
+  user(login: $login) {
+    followers { totalCount }
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      totalCount
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        nameWithOwner
+        stargazerCount
+        pushedAt
+        updatedAt
+        primaryLanguage { name }
+        repositoryTopics(first: 20) { nodes { topic { name } } }
+        languages(first: 25, orderBy: {field: SIZE, direction: DESC}) @include(if: $languages) {
+          edges { size node { name } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+def _use_graphql():
+    if GITHUB_BACKEND == "graphql":
+        return True
+    return GITHUB_BACKEND == "auto" and bool(GITHUB_TOKENS)
+
+
+async def _graphql_query(client, query, variables):
+    """POST one GraphQL query; returns its ``data``, with ``user: None`` for an unknown login."""
+    payload = {"query": query, "variables": variables}
+
+    async def send():
+        return await _scheduled_request(client, GITHUB_GRAPHQL_URL, {}, payload, _graphql_scheduler)
+
+    key = "POST " + GITHUB_GRAPHQL_URL + " " + json.dumps(payload, sort_keys=True)
+    response = await _shared_flight(key, send, _graphql_scheduler)
+    if response.status_code != 200:
+        raise GraphQLError(f"HTTP {response.status_code}")
+    body = response.json()
+    data = body.get("data") or {}
+    errors = body.get("errors") or []
+    if errors and not data.get("user"):
+        if all(error.get("type") == "NOT_FOUND" for error in errors):
+            return {"user": None}
+        raise GraphQLError(errors[0].get("message", "query failed"))
+    return data
+
+
+def _graphql_repo(node):
+    # same shape as a REST repo record, plus the inline language byte counts
+    record = {
+        "full_name": node.get("nameWithOwner"),
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "stargazers_count": node.get("stargazerCount", 0),
+        "pushed_at": node.get("pushedAt"),
+        "updated_at": node.get("updatedAt"),
+        "topics": [t["topic"]["name"] for t in (node.get("repositoryTopics") or {}).get("nodes", [])],
+    }
+    languages = node.get("languages")
+    if languages is not None:
+        languages = {edge["node"]["name"]: edge["size"] for edge in languages.get("edges", [])}
+    return record, languages
+
+
+def _graphql_repos(nodes):
+    for node in nodes:
+        record, languages = _graphql_repo(node)
+        yield record["full_name"], (record, languages)
+
+
+async def _analyze_graphql_async(username, deep):
+    """Profile summary from the GraphQL API: one query per 100 repos, languages and topics inline.
+
+    Like the REST path it reads and stores the per-user snapshot: repos come
+    newest-updated first and paging stops at the first page that reaches the
+    snapshot's cutoff. A merged count that disagrees with ``totalCount`` (or,
+    in deep mode, a repo without stored language counts) pages on to the end.
     """
+    client = _get_client()
+    cache = get_http_cache()
+    snapshot = await asyncio.to_thread(cache.get_snapshot, username)
+    cutoff = snapshot[0] if snapshot is not None else None
+    nodes = []
+    cursor = None
+    user = None
+
+    async def fetch(until_cutoff):
+        nonlocal cursor, user
+        while True:
+            data = await _graphql_query(
+                client, GRAPHQL_PROFILE_QUERY, {"login": username, "cursor": cursor, "languages": deep}
+            )
+            user = data.get("user")
+            if user is None:
+                return False
+            page = user["repositories"].get("nodes") or []
+            nodes.extend(page)
+            page_info = user["repositories"].get("pageInfo") or {}
+            cursor = page_info.get("endCursor")
+            if not page_info.get("hasNextPage"):
+                cursor = None
+                return True
+            if until_cutoff and any((node.get("updatedAt") or "") < cutoff for node in page):
+                return True
+
+    if not await fetch(until_cutoff=snapshot is not None):
+        return None
+    total = user["repositories"].get("totalCount")
+    fetched = dict(_graphql_repos(nodes))
+
+    repos = None
+    if snapshot is not None:
+        repos = dict(snapshot[1])
+        for name, (record, _) in fetched.items():
+            if (record["updated_at"] or "") >= cutoff:
+                repos[name] = record
+        if total is not None and len(repos) != total:
+            repos = None
+    language_bytes = None
+    if repos is not None and deep:
+        language_bytes = {}
+        stored = await asyncio.to_thread(
+            cache.get_languages,
+            [(name, record["pushed_at"] or "") for name, record in repos.items() if name not in fetched],
+        )
+        for name, record in repos.items():
+            languages = fetched[name][1] if name in fetched else stored.get(name)
+            if languages is None:
+                repos = None
+                break
+            for lang, size in languages.items():
+                language_bytes[lang] = language_bytes.get(lang, 0) + int(size)
+    if repos is None:
+        if cursor is not None and not await fetch(until_cutoff=False):
+            return None
+        fetched = dict(_graphql_repos(nodes))
+        repos = {name: record for name, (record, _) in fetched.items()}
+        if deep:
+            language_bytes = {}
+            for _, languages in fetched.values():
+                for lang, size in (languages or {}).items():
+                    language_bytes[lang] = language_bytes.get(lang, 0) + int(size)
+
+    if deep:
+        await asyncio.to_thread(cache.put_languages, [
+            (record["full_name"], record["pushed_at"] or "", languages)
+            for record, languages in fetched.values() if languages is not None
+        ])
+    await asyncio.to_thread(cache.put_snapshot, username, repos)
+    user_data = {"public_repos": total if total is not None else len(repos), "followers": user["followers"]["totalCount"]}
+    return _summarize(user_data, list(repos.values()), language_bytes)
+
+
+async def analyze_github_profile_async(username, deep=False):
+    """Profile summary for ``username``, or ``None`` if it cannot be fetched.
+
+    With a token configured (or ``GITHUB_BACKEND=graphql``) the GraphQL API
+    is tried first, falling back to REST if it fails.
+    """
+    if _use_graphql():
+        try:
+            return await _analyze_graphql_async(username, deep)
+        except (httpx.HTTPError, RateLimited, GraphQLError, ValueError, KeyError) as exc:
+            print("[github_analyzer] warning: GraphQL fetch failed, using REST:", exc)
+    return await _analyze_rest_async(username, deep)
+
+
+async def _analyze_rest_async(username, deep=False):
+    """Profile summary from the REST API.
+
+    Repos are stored per user after each run. Later runs read the repo list
+    newest-updated first and stop at the first repo older than the stored
+    snapshot, merging only what changed. If the merged count disagrees with
+    ``public_repos`` (e.g. a repo was deleted) everything is refetched.
+
+    ``deep=True`` also fetches every repo's language byte breakdown and adds
+    ``language_bytes`` and byte-weighted ``language_shares`` to the result.
+    """
+    user_url = GITHUB_API_URL + username
+    repos_url = user_url + "/repos"
+    client = _get_client()
+    cache = get_http_cache()
+    snapshot = await asyncio.to_thread(cache.get_snapshot, username)
+    params = {"per_page": REPOS_PER_PAGE, "page": 1, "sort": "updated", "direction": "desc"}
+
+    try:
+        user_response, first_page = await asyncio.gather(
+            _cached_get(client, user_url),
+            _cached_get(client, repos_url, params=params),
+        )
+        if user_response.status_code != 200:
+            return None
+        user_data = user_response.json()
+
+        repos = None
+        if snapshot is not None and first_page.status_code == 200:
+            cutoff, repos = snapshot
+            for repo in await _fetch_repos_since(client, first_page, cutoff):
+                record = _repo_record(repo)
+                repos[record["full_name"]] = record
+            if len(repos) != user_data.get("public_repos", len(repos)):
+                repos = None
+        if repos is None:
+            repos = {}
+            for repo in await _fetch_pages(client, first_page):
+                record = _repo_record(repo)
+                repos[record["full_name"]] = record
+        if first_page.status_code == 200:
+            await asyncio.to_thread(cache.put_snapshot, username, repos)
+
+        repos_data = list(repos.values())
+        language_bytes = await _fetch_language_bytes(client, repos_data) if deep else None
+    except httpx.HTTPError:
+        return None
+    except RateLimited as exc:
+        print("[github_analyzer] warning:", exc)
+        return None
+
+    return _summarize(user_data, repos_data, language_bytes)
+
+
+def _aggregate_team(profiles):
+    """Sum member profiles; ``language_members`` counts the members using each language."""
+    found = [p for p in profiles.values() if p]
+    languages = {}
+    language_members = {}
+    language_bytes = {}
+    for profile in found:
+        for lang, count in profile["languages"].items():
+            languages[lang] = languages.get(lang, 0) + count
+        for lang in set(profile["languages"]) | set(profile.get("language_bytes", {})):
+            language_members[lang] = language_members.get(lang, 0) + 1
+        for lang, size in profile.get("language_bytes", {}).items():
+            language_bytes[lang] = language_bytes.get(lang, 0) + size
+
+    aggregate = {
+        "members": len(profiles),
+        "members_found": len(found),
+        "total_repos": sum(p["total_repos"] for p in found),
+        "total_stars": sum(p["total_stars"] for p in found),
+        "followers": sum(p["followers"] for p in found),
+        "languages": dict(sorted(languages.items(), key=lambda item: -item[1])),
+        "language_members": dict(sorted(language_members.items(), key=lambda item: -item[1])),
+    }
+    if language_bytes:
+        total_bytes = sum(language_bytes.values())
+        ranked = sorted(language_bytes.items(), key=lambda item: -item[1])
+        aggregate["language_bytes"] = dict(ranked)
+        aggregate["language_shares"] = {lang: round(size / total_bytes, 4) for lang, size in ranked}
+    return aggregate
+
+
+async def fetch_org_members_async(org):
+    """Public member logins of ``org``, or ``None`` if the org cannot be read."""
+    client = _get_client()
+    try:
+        first_page = await _cached_get(
+            client, f"{GITHUB_API_BASE}/orgs/{org}/members", params={"per_page": 100, "page": 1}
+        )
+        if first_page.status_code != 200:
+            return None
+        members = await _fetch_pages(client, first_page)
+    except (httpx.HTTPError, RateLimited) as exc:
+        print("[github_analyzer] warning: could not list org members:", exc)
+        return None
+    return [m["login"] for m in members if isinstance(m, dict) and m.get("login")]
+
+
+async def analyze_github_team_async(org=None, usernames=None, deep=False):
+    """Profiles of an org's public members and/or explicit ``usernames``, fetched concurrently.
+
+    Every member goes through the same pooled client, cache and rate-limit
+    scheduler as single analyses, at most ``MEMBER_CONCURRENCY`` at a time.
+    Returns ``{"org", "members": {login: profile or None}, "aggregate"}``,
+    or ``None`` if ``org`` cannot be read.
+    """
+    logins = list(usernames or [])
+    if org:
+        members = await fetch_org_members_async(org)
+        if members is None:
+            return None
+        logins.extend(members)
+    logins = list(dict.fromkeys(login.strip() for login in logins if login and login.strip()))
+    logins = logins[:TEAM_MAX_MEMBERS]
+
+    semaphore = asyncio.Semaphore(MEMBER_CONCURRENCY)
+
+    async def profile_of(login):
+        async with semaphore:
+            return await analyze_github_profile_async(login, deep)
+
+    profiles = dict(zip(logins, await asyncio.gather(*(profile_of(login) for login in logins))))
+    return {"org": org, "members": profiles, "aggregate": _aggregate_team(profiles)}
+
+
+def _get_sync_loop():
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="github-client", daemon=True).start()
+            _sync_loop = loop
+    return _sync_loop
+
+
+def run_sync(coro):
+    """Run ``coro`` on the shared background loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_sync_loop()).result()
+
+
+def analyze_github_profile(username, deep=False):
+    """Blocking wrapper around :func:`analyze_github_profile_async`."""
+    return run_sync(analyze_github_profile_async(username, deep))
+
+
+def analyze_github_team(org=None, usernames=None, deep=False):
+    """Blocking wrapper around :func:`analyze_github_team_async`."""
+    return run_sync(analyze_github_team_async(org, usernames, deep))
+
+
+def github_profile_lines(profile_data):
+    """The profile stats as prompt bullet lines."""
+    shares = profile_data.get("language_shares")
+    if shares:
+        top_languages = ", ".join(f"{lang} {share:.0%}" for lang, share in list(shares.items())[:8])
+        top_languages += " (share of code bytes across all repos)"
+    else:
+        top_languages = f"{profile_data['languages']} (repos per primary language)"
+    return f"""- Public Repos: {profile_data['total_repos']}
+    - Followers: {profile_data['followers']}
+    - Total Stars Earned: {profile_data['total_stars']}
+    - Top Languages: {top_languages}"""
+
+
+def github_feedback_prompt(username, profile_data):
     prompt = f"""
     You are a Senior Technical Recruiter. Review this GitHub profile summary for user '{username}':
     
-    - Public Repos: {profile_data['total_repos']}
-    - Followers: {profile_data['followers']}
-    - Total Stars Earned: {profile_data['total_stars']}
-    - Top Languages: {profile_data['languages']}
+    {github_profile_lines(profile_data)}
     
     Based ONLY on these stats, provide a honest, 3-sentence assessment of their engineering level (Junior/Mid/Senior/Expert).
     Then, give 2 specific tips to improve their profile visibility.
@@ -65,9 +887,17 @@ def analyze_github_with_ai(username, profile_data):
     1. [Tip 1]
     2. [Tip 2]
     """
-    
-    response = query_ollama(prompt)
+    return cached_prompt("github_feedback", 2, prompt, username=username, profile=profile_data)
+
+
+def finish_github_feedback(response):
     if not response:
         return "Could not generate AI feedback at this time."
-        
     return response
+
+
+def analyze_github_with_ai(username, profile_data):
+    """
+    Sends GitHub stats to Llama 3 for a qualitative recruiter review.
+    """
+    return finish_github_feedback(query_ollama(github_feedback_prompt(username, profile_data)))
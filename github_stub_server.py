@@ -0,0 +1,400 @@
+"""Local stand-in for the GitHub REST and GraphQL APIs, for load and rate-limit testing.
+
+Serves ``/users/{name}``, ``/users/{name}/repos`` and
+``/orgs/{org}/members`` (Link-header pagination) and
+``/repos/{owner}/{repo}/languages``, with ETag / 304
+revalidation and per-token ``X-RateLimit-*`` budgets (a 304 is free, as
+on GitHub). ``POST /graphql`` answers the profile query of
+``github_analyzer`` (it reads only the variables, not the query text) and
+needs a token, with a budget separate from REST. Every username exists
+except "ghost". ``GET /_stats`` returns upstream request counts.
+
+Usage:
+  python github_stub_server.py [--port 8765] [--repos 250] [--rate-limit 60]
+                               [--window 60] [--latency-ms 50]
+  GITHUB_API_BASE=http://127.0.0.1:8765 streamlit run app.py
+
+  python github_stub_server.py --selftest
+      runs concurrent analyses against an in-process stub and prints how
+      many requests reached it (coalescing, caching, rate limiting); exits
+      non-zero if a consistency check fails
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LANGUAGES = ("Python", "JavaScript", "Go", "TypeScript", "Rust", "Jupyter Notebook", None)
+TOPICS = ("machine-learning", "web", "cli", "data", "devops")
+
+
+class StubState:
+    def __init__(self, repos=250, rate_limit=60, window=60, latency_ms=50, members=12):
+        self.repos = repos
+        self.members = members
+        self.rate_limit = rate_limit
+        self.window = window
+        self.latency = latency_ms / 1000.0
+        self.lock = threading.Lock()
+        self.budgets = {}
+        self.requests = Counter()
+        # per-repo changes made after start: {index: (updated_at, extra stars)}
+        self.changes = {}
+        self.deleted = set()
+
+    def touch(self, i, stars=1):
+        """Simulate activity on repo ``i``: bump its updated_at and stars."""
+        with self.lock:
+            _, extra = self.changes.get(i, (None, 0))
+            stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.changes[i] = (stamp, extra + stars)
+
+    def live_repos(self, sort=None):
+        indexes = [i for i in range(self.repos) if i not in self.deleted]
+        if sort == "updated":
+            indexes.sort(key=lambda i: self.updated_at(i), reverse=True)
+        return indexes
+
+    def updated_at(self, i):
+        if i in self.changes:
+            return self.changes[i][0]
+        stamp = datetime(2026, 1, 1, tzinfo=timezone.utc) - timedelta(minutes=i)
+        return stamp.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def spend(self, token, free=False):
+        """Return ``(allowed, remaining, reset)`` for ``token`` after this request."""
+        with self.lock:
+            now = time.time()
+            remaining, reset = self.budgets.get(token, (self.rate_limit, now + self.window))
+            if now >= reset:
+                remaining, reset = self.rate_limit, now + self.window
+            allowed = free or remaining > 0
+            if allowed and not free:
+                remaining -= 1
+            self.budgets[token] = (remaining, reset)
+            return allowed, remaining, int(reset)
+
+    def user(self, name):
+        return {"login": name, "public_repos": len(self.live_repos()), "followers": len(name) * 7}
+
+    def languages(self, repo_name):
+        i = int(repo_name.rsplit("-", 1)[-1]) if repo_name.rsplit("-", 1)[-1].isdigit() else 0
+        primary = LANGUAGES[i % len(LANGUAGES)] or "Markdown"
+        return {primary: 1000 * (i + 1), "Shell": 40 + i, "Dockerfile": 25}
+
+    def repo(self, name, i):
+        return {
+            "name": f"{name}-repo-{i}",
+            "full_name": f"{name}/{name}-repo-{i}",
+            "language": LANGUAGES[i % len(LANGUAGES)],
+            "stargazers_count": i % 5 + self.changes.get(i, (None, 0))[1],
+            "pushed_at": self.updated_at(i),
+            "updated_at": self.updated_at(i),
+            "topics": list(TOPICS[i % len(TOPICS):i % len(TOPICS) + 2]),
+        }
+
+    def graphql_user(self, name, cursor=None, languages=False, first=100):
+        """``data.user`` of the profile query (newest-updated first); cursors are plain offsets."""
+        indexes = self.live_repos("updated")
+        start = int(cursor or 0)
+        nodes = []
+        for i in indexes[start:start + first]:
+            repo = self.repo(name, i)
+            node = {
+                "nameWithOwner": repo["full_name"],
+                "stargazerCount": repo["stargazers_count"],
+                "pushedAt": repo["pushed_at"],
+                "updatedAt": repo["updated_at"],
+                "primaryLanguage": {"name": repo["language"]} if repo["language"] else None,
+                "repositoryTopics": {"nodes": [{"topic": {"name": t}} for t in repo["topics"]]},
+            }
+            if languages:
+                ranked = sorted(self.languages(repo["name"]).items(), key=lambda item: -item[1])
+                node["languages"] = {"edges": [{"size": size, "node": {"name": lang}} for lang, size in ranked]}
+            nodes.append(node)
+        end = start + len(nodes)
+        return {
+            "followers": {"totalCount": self.user(name)["followers"]},
+            "repositories": {
+                "totalCount": len(indexes),
+                "pageInfo": {"hasNextPage": end < len(indexes), "endCursor": str(end)},
+                "nodes": nodes,
+            },
+        }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=None, headers=None):
+            data = json.dumps(body).encode("utf-8") if body is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/_stats":
+                with state.lock:
+                    return self._send(200, {"total": sum(state.requests.values()), "paths": dict(state.requests)})
+
+            with state.lock:
+                state.requests[url.path] += 1
+            time.sleep(state.latency)
+            body, links = self._route(url)
+            if body is None:
+                return self._send(404, {"message": "Not Found"})
+
+            data = json.dumps(body).encode("utf-8")
+            etag = '"%s"' % hashlib.sha1(data).hexdigest()[:16]
+            token = self.headers.get("Authorization") or "anonymous"
+            not_modified = self.headers.get("If-None-Match") == etag
+            allowed, remaining, reset = state.spend(token, free=not_modified)
+            headers = {
+                "ETag": etag,
+                "X-RateLimit-Limit": str(state.rate_limit),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(reset),
+            }
+            if not allowed:
+                return self._send(403, {"message": "API rate limit exceeded"}, headers)
+            if not_modified:
+                return self._send(304, None, headers)
+            if links:
+                headers["Link"] = ", ".join(f'<{href}>; rel="{rel}"' for rel, href in links)
+            self._send(200, body, headers)
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/graphql":
+                return self._send(404, {"message": "Not Found"})
+            with state.lock:
+                state.requests[url.path] += 1
+            time.sleep(state.latency)
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            token = self.headers.get("Authorization")
+            if not token:
+                return self._send(401, {"message": "This endpoint requires you to be authenticated."})
+            allowed, remaining, reset = state.spend("graphql " + token)
+            headers = {
+                "X-RateLimit-Limit": str(state.rate_limit),
+                "X-RateLimit-Remaining": str(remaining),
+                "X-RateLimit-Reset": str(reset),
+                "X-RateLimit-Resource": "graphql",
+            }
+            if not allowed:
+                return self._send(403, {"message": "API rate limit exceeded"}, headers)
+            variables = payload.get("variables") or {}
+            login = variables.get("login", "")
+            if login == "ghost":
+                return self._send(200, {
+                    "data": {"user": None},
+                    "errors": [{"type": "NOT_FOUND", "message": f"Could not resolve to a User with the login of '{login}'."}],
+                }, headers)
+            user = state.graphql_user(login, variables.get("cursor"), bool(variables.get("languages")))
+            self._send(200, {"data": {"user": user}}, headers)
+
+        def _route(self, url):
+            parts = [p for p in url.path.split("/") if p]
+            if len(parts) == 4 and parts[0] == "repos" and parts[3] == "languages":
+                return state.languages(parts[2]), None
+            if len(parts) == 3 and parts[0] == "orgs" and parts[2] == "members":
+                return self._page(url, [{"login": f"{parts[1]}-member-{i}"} for i in range(state.members)])
+            if len(parts) < 2 or parts[0] != "users" or parts[1] == "ghost":
+                return None, None
+            name = parts[1]
+            if len(parts) == 2:
+                return state.user(name), None
+            if len(parts) == 3 and parts[2] == "repos":
+                query = parse_qs(url.query)
+                per_page = min(int(query.get("per_page", ["30"])[0]), 100)
+                page = int(query.get("page", ["1"])[0])
+                indexes = state.live_repos(query.get("sort", [None])[0])
+                last = max((len(indexes) + per_page - 1) // per_page, 1)
+                start = (page - 1) * per_page
+                body = [state.repo(name, i) for i in indexes[start:start + per_page]]
+                sort = f"&sort={query['sort'][0]}" if "sort" in query else ""
+                base = f"http://{self.headers['Host']}{url.path}?per_page={per_page}{sort}&page="
+                links = []
+                if page < last:
+                    links.append(("next", f"{base}{page + 1}"))
+                links.append(("last", f"{base}{last}"))
+                return body, links
+            return None, None
+
+        def _page(self, url, items):
+            query = parse_qs(url.query)
+            per_page = min(int(query.get("per_page", ["30"])[0]), 100)
+            page = int(query.get("page", ["1"])[0])
+            last = max((len(items) + per_page - 1) // per_page, 1)
+            base = f"http://{self.headers['Host']}{url.path}?per_page={per_page}&page="
+            links = [("next", f"{base}{page + 1}")] if page < last else []
+            links.append(("last", f"{base}{last}"))
+            return items[(page - 1) * per_page:page * per_page], links
+
+    return Handler
+
+
+def start_stub(port=0, **options):
+    """Start a stub server on a daemon thread; returns ``(server, state)``."""
+    state = StubState(**options)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, name="github-stub", daemon=True).start()
+    return server, state
+
+
+def selftest():
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    server, state = start_stub(repos=250, rate_limit=12, window=3600, latency_ms=100)
+    os.environ["GITHUB_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    # a fresh cache per run, so request counts don't depend on earlier runs
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ["GITHUB_CACHE_PATH"] = os.path.join(cache_dir.name, "github_cache.db")
+    import github_analyzer
+
+    failures = []
+
+    def check(ok, message):
+        if not ok:
+            failures.append(message)
+            print("FAILED:", message)
+
+    def upstream():
+        return sum(state.requests.values())
+
+    with ThreadPoolExecutor(20) as pool:
+        results = list(pool.map(github_analyzer.analyze_github_profile, ["octocat"] * 20))
+    print(f"20 concurrent analyses of one user: {upstream()} upstream requests, "
+          f"all equal: {all(r == results[0] for r in results)}")
+    check(results[0] is not None and all(r == results[0] for r in results),
+          "concurrent analyses of one user disagree")
+
+    github_analyzer.GITHUB_CACHE_FRESH_SECONDS = 0
+    github_analyzer.analyze_github_profile("octocat")
+    print(f"revalidated profile: {upstream()} upstream requests in total")
+
+    state.rate_limit = 1000
+    state.budgets.clear()
+    before = upstream()
+    deep = github_analyzer.analyze_github_profile("octocat", deep=True)
+    first = upstream() - before
+    github_analyzer.analyze_github_profile("octocat", deep=True)
+    print(f"deep analysis: {first} upstream requests, then {upstream() - before - first} when repeated; "
+          f"top shares {dict(list(deep['language_shares'].items())[:3])}")
+
+    before = upstream()
+    state.touch(7)
+    state.touch(42, stars=3)
+    refreshed = github_analyzer.analyze_github_profile("octocat")
+    print(f"incremental refresh after 2 repos changed: {upstream() - before} upstream requests, "
+          f"stars {deep['total_stars']} -> {refreshed['total_stars']}")
+    before = upstream()
+    state.deleted.add(3)
+    refreshed = github_analyzer.analyze_github_profile("octocat")
+    print(f"after a repo was deleted (full resync): {upstream() - before} upstream requests, "
+          f"repos {refreshed['total_repos']}")
+
+    before = upstream()
+    started = time.perf_counter()
+    team = github_analyzer.analyze_github_team(org="acme")
+    print(f"team of {team['aggregate']['members']}: {upstream() - before} upstream requests in "
+          f"{time.perf_counter() - started:.2f}s, {team['aggregate']['total_repos']} repos")
+
+    # GraphQL: a token selects it automatically; one query per 100 repos, languages inline,
+    # and refreshes stop paging at the stored snapshot like the REST path
+    github_analyzer.GITHUB_TOKENS = ["stub-token"]
+    github_analyzer._graphql_scheduler = github_analyzer.GitHubScheduler(["stub-token"])
+
+    def graphql_queries(analysis):
+        before = state.requests["/graphql"]
+        result = analysis()
+        return result, state.requests["/graphql"] - before
+
+    def rest_analysis(username):
+        github_analyzer.GITHUB_TOKENS = []
+        try:
+            return github_analyzer.analyze_github_profile(username, deep=True)
+        finally:
+            github_analyzer.GITHUB_TOKENS = ["stub-token"]
+
+    graphql, queries = graphql_queries(lambda: github_analyzer.analyze_github_profile("hubot", deep=True))
+    rest = rest_analysis("hubot")
+    print(f"GraphQL deep analysis: {queries} queries for {graphql['total_repos']} repos, "
+          f"same result as REST: {graphql == rest}")
+    check(graphql is not None and graphql == rest, "GraphQL and REST deep analyses differ")
+
+    state.touch(11, stars=2)
+    graphql, queries = graphql_queries(lambda: github_analyzer.analyze_github_profile("hubot", deep=True))
+    rest = rest_analysis("hubot")
+    print(f"GraphQL refresh after 1 repo changed: {queries} queries, same result as REST: {graphql == rest}")
+    check(queries <= 2, f"GraphQL refresh took {queries} queries")
+    check(graphql is not None and graphql == rest, "GraphQL and REST refreshes differ")
+
+    state.deleted.add(12)
+    graphql, queries = graphql_queries(lambda: github_analyzer.analyze_github_profile("hubot", deep=True))
+    rest = rest_analysis("hubot")
+    print(f"GraphQL after a repo was deleted (full resync): {queries} queries, repos {graphql['total_repos']}")
+    check(graphql is not None and graphql == rest, "GraphQL and REST differ after a deletion")
+    github_analyzer.GITHUB_TOKENS = ["stub-token"]
+    ghost = github_analyzer.analyze_github_profile("ghost")
+    print(f"GraphQL unknown user: {ghost}, REST requests during it: {state.requests['/users/ghost']}")
+    check(ghost is None, "GraphQL analysis of an unknown user did not return None")
+    check(state.requests["/users/ghost"] == 0, "GraphQL analysis of an unknown user fell back to REST")
+    github_analyzer.GITHUB_TOKENS = []
+
+    state.rate_limit = 12
+    state.budgets.clear()
+
+    names = [f"user{i}" for i in range(4)]
+    results = [github_analyzer.analyze_github_profile(name) for name in names]
+    print(f"analyses after the budget ran out: {sum(r is None for r in results)} of {len(names)} returned None")
+    github_analyzer.analyze_github_profile("octocat")
+    print("cache:", github_analyzer.github_cache_stats())
+    print("rate limit:", github_analyzer.github_rate_limit_status())
+    server.shutdown()
+    cache_dir.cleanup()
+    print(f"{len(failures)} failed checks")
+    sys.exit(1 if failures else 0)
+
+
+def main():
+    args = sys.argv[1:]
+    if "--selftest" in args:
+        return selftest()
+
+    def option(name, default):
+        return type(default)(args[args.index(name) + 1]) if name in args else default
+
+    server, _ = start_stub(
+        port=option("--port", 8765),
+        repos=option("--repos", 250),
+        rate_limit=option("--rate-limit", 60),
+        window=option("--window", 60),
+        latency_ms=option("--latency-ms", 50),
+    )
+    print(f"GitHub stub listening on http://127.0.0.1:{server.server_port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,140 +1,6 @@
-job_roles = {
-    "Data Scientist": [
-        "Python",
-        "Machine Learning",
-        "Statistics",
-        "Data Visualization",
-        "Pandas",
-        "NumPy",
-        "SQL",
-        "Scikit-learn",
-        "TensorFlow"
-    ],
-    "AI Engineer": [
-        "Python",
-        "Deep Learning",
-        "TensorFlow",
-        "PyTorch",
-        "NLP",
-        "Computer Vision",
-        "MLOps",
-        "Docker",
-        "Kubernetes"
-    ],
-    "Data Analyst": [
-        "SQL",
-        "Python",
-        "Excel",
-        "Tableau",
-        "Power BI",
-        "Data Visualization",
-        "Statistics",
-        "Pandas"
-    ],
-    "Machine Learning Engineer": [
-        "Python",
-        "Machine Learning",
-        "Deep Learning",
-        "Scikit-learn",
-        "TensorFlow",
-        "PyTorch",
-        "SQL",
-        "Spark",
-        "Hadoop"
-    ],
-    "Web Developer": [
-        "HTML",
-        "CSS",
-        "JavaScript",
-        "React",
-        "Node.js",
-        "Git",
-        "REST APIs",
-        "SQL"
-    ],
-    "Full Stack Developer": [
-        "HTML",
-        "CSS",
-        "JavaScript",
-        "React",
-        "Node.js",
-        "Express",
-        "MongoDB",
-        "SQL",
-        "Git",
-        "Docker"
-    ],
-    "Frontend Developer": [
-        "HTML",
-        "CSS",
-        "JavaScript",
-        "React",
-        "Vue.js",
-        "Angular",
-        "Tailwind CSS",
-        "Git"
-    ],
-    "Backend Developer": [
-        "Python",
-        "Java",
-        "Node.js",
-        "Django",
-        "Flask",
-        "SQL",
-        "NoSQL",
-        "REST APIs",
-        "Docker"
-    ],
-    "DevOps Engineer": [
-        "Linux",
-        "Python",
-        "Bash",
-        "Docker",
-        "Kubernetes",
-        "AWS",
-        "Azure",
-        "CI/CD",
-        "Terraform",
-        "Jenkins"
-    ],
-    "Mobile App Developer": [
-        "Java",
-        "Kotlin",
-        "Swift",
-        "Flutter",
-        "React Native",
-        "Firebase",
-        "Git"
-    ],
-    "Cloud Architect": [
-        "AWS",
-        "Azure",
-        "Google Cloud",
-        "Docker",
-        "Kubernetes",
-        "Terraform",
-        "Linux",
-        "Networking",
-        "Security"
-    ],
-    "Cybersecurity Analyst": [
-        "Network Security",
-        "Linux",
-        "Python",
-        "Penetration Testing",
-        "Ethical Hacking",
-        "Firewalls",
-        "SIEM",
-        "Cryptography"
-    ],
-    "Product Manager": [
-        "Product Strategy",
-        "Agile",
-        "Scrum",
-        "User Research",
-        "Data Analysis",
-        "Communication",
-        "Roadmapping",
-        "JIRA"
-    ]
-}
+from taxonomy import load_taxonomy_source
+
+# Role -> required skills, loaded from data/taxonomy.json at import time.
+# Long-running processes should go through taxonomy.get_taxonomy(), which
+# picks up edits to the file without a restart.
+job_roles = load_taxonomy_source()["job_roles"]
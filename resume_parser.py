@@ -1,6 +1,6 @@
 
 
-from utils import SKILL_DATABASE
+from taxonomy import get_taxonomy
 import PyPDF2
 import docx
 
@@ -35,13 +35,75 @@ def extract_text_from_docx(file):
 
 
 # ---------- Extract Skills ----------
-def extract_skills_from_resume(resume_text):
-    found_skills = []
+def extract_skill_matches(resume_text, fuzzy=False):
+    """Return ``(start, end, skill)`` tuples for every skill mention in the text.
 
-    resume_text = resume_text.lower()
+    With ``fuzzy=True`` misspelled or re-spaced mentions ("Kubernates",
+    "Tensor Flow") within a small edit distance are reported as well.
+    """
+    taxonomy = get_taxonomy()
+    matches = taxonomy.matcher.find_all(resume_text or "")
+    if fuzzy:
+        matches = sorted(set(matches) | set(taxonomy.fuzzy_index.find_all(resume_text or "")))
+    return matches
 
-    for skill in SKILL_DATABASE:
-        if skill.lower() in resume_text:
-            found_skills.append(skill)
 
-    return found_skills
+def extract_skills_from_resume(resume_text, fuzzy=False):
+    taxonomy = get_taxonomy()
+    skills = taxonomy.matcher.extract(resume_text or "")
+    if fuzzy:
+        extra = [s for s in taxonomy.fuzzy_index.extract(resume_text or "") if s not in skills]
+        skills = skills + extra
+    return skills
+
+
+# ---------- Section-aware chunking ----------
+SECTION_HEADINGS = {
+    "summary": "Summary", "profile": "Summary", "objective": "Summary", "about me": "Summary",
+    "professional summary": "Summary",
+    "experience": "Experience", "work experience": "Experience", "professional experience": "Experience",
+    "employment history": "Experience", "work history": "Experience", "internships": "Experience",
+    "projects": "Projects", "personal projects": "Projects", "academic projects": "Projects",
+    "skills": "Skills", "technical skills": "Skills", "core competencies": "Skills",
+    "education": "Education", "certifications": "Certifications", "certificates": "Certifications",
+    "achievements": "Achievements", "awards": "Achievements", "publications": "Publications",
+}
+CHUNK_MAX_WORDS = 60
+
+
+def _section_heading(line):
+    key = line.strip().strip(":").strip().lower()
+    return SECTION_HEADINGS.get(key) if len(key) <= 30 else None
+
+
+def chunk_resume(resume_text, max_words=CHUNK_MAX_WORDS):
+    """Split resume text into ``(section, chunk)`` pairs of at most ``max_words`` words.
+
+    Chunks never cross a section heading, and lines are kept whole unless a
+    single line is longer than ``max_words``. Text before the first heading
+    is filed under "Summary".
+    """
+    chunks = []
+    section = "Summary"
+    words = []
+
+    def flush():
+        if words:
+            chunks.append((section, " ".join(words)))
+            words.clear()
+
+    for line in (resume_text or "").splitlines():
+        heading = _section_heading(line)
+        if heading:
+            flush()
+            section = heading
+            continue
+        line_words = line.split()
+        if words and len(words) + len(line_words) > max_words:
+            flush()
+        for i in range(0, len(line_words), max_words):
+            words.extend(line_words[i:i + max_words])
+            if len(words) >= max_words:
+                flush()
+    flush()
+    return chunks
@@ -0,0 +1,142 @@
+import numpy as np
+
+from taxonomy import get_taxonomy
+from skill_bitsets import normalize_skill
+
+# rebuilt when the taxonomy snapshot changes
+_model = None
+
+# a role's semantic fit averages its best-matching resume chunks
+SEMANTIC_TOP_CHUNKS = 3
+
+
+class RoleFitModel:
+    """Skill x role incidence matrix for scoring a candidate against every role at once."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.version = snapshot.version
+        self.roles = list(snapshot.role_names)
+        self.num_skills = len(snapshot.skills)
+        self.role_skill_ids = [list(snapshot.role_skill_ids(role)) for role in self.roles]
+
+        incidence = np.zeros((self.num_skills, len(self.roles)), dtype=np.float32)
+        for col, ids in enumerate(self.role_skill_ids):
+            for idx in ids:
+                incidence[idx, col] += 1
+        self.incidence = incidence
+        self.role_sizes = incidence.sum(axis=0, dtype=np.float64)
+
+    def coverage_vector(self, user_skills):
+        """0/1 vector over taxonomy skills covered by the candidate's skills."""
+        cover = self.snapshot.bitsets.coverage({normalize_skill(s) for s in user_skills})
+        raw = np.frombuffer(cover.to_bytes((self.num_skills + 7) // 8 or 1, "little"), dtype=np.uint8)
+        return np.unpackbits(raw, bitorder="little")[:self.num_skills].astype(np.float32)
+
+    def scores(self, coverage):
+        matched = (coverage @ self.incidence).astype(np.float64)
+        fraction = np.divide(matched, self.role_sizes, out=np.zeros_like(matched), where=self.role_sizes > 0)
+        return fraction * 100
+
+    def rank(self, user_skills, top_k=5, semantic_scores=None):
+        coverage = self.coverage_vector(user_skills)
+        scores = self.scores(coverage)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+
+        results = []
+        for col in order:
+            skills = [self.snapshot.skills[i] for i in self.role_skill_ids[col]]
+            matched = [s for s, i in zip(skills, self.role_skill_ids[col]) if coverage[i]]
+            fit = {
+                "role": self.roles[col],
+                "score": float(scores[col]),
+                "matched": matched,
+                "missing": [s for s in skills if s not in matched],
+            }
+            if semantic_scores is not None:
+                fit["semantic_score"] = semantic_scores.get(self.roles[col])
+            results.append(fit)
+        return results
+
+    def team_gap(self, member_skills, role):
+        """Gap of a whole team against ``role`` from one members x skills product.
+
+        ``member_skills`` maps member name -> skill list. Returns the team
+        score (union of member skills), each member's own score, how many
+        members cover every role skill, and what nobody covers.
+        """
+        col = next((i for i, r in enumerate(self.roles) if r.lower() == (role or "").lower()), None)
+        if col is None:
+            return None
+        names = list(member_skills)
+        coverage = np.zeros((len(names), self.num_skills), dtype=np.float32)
+        for row, name in enumerate(names):
+            coverage[row] = self.coverage_vector(member_skills[name])
+
+        member_scores = self.scores(coverage)[:, col] if names else np.zeros(0)
+        team_coverage = coverage.max(axis=0) if names else np.zeros(self.num_skills, dtype=np.float32)
+        role_ids = self.role_skill_ids[col]
+        counts = coverage[:, role_ids].sum(axis=0) if names else np.zeros(len(role_ids))
+        skills = [self.snapshot.skills[i] for i in role_ids]
+        return {
+            "role": self.roles[col],
+            "team_score": float(self.scores(team_coverage)[col]),
+            "member_scores": {name: float(score) for name, score in zip(names, member_scores)},
+            "skill_coverage": {skill: int(count) for skill, count in zip(skills, counts)},
+            "missing": [skill for skill, count in zip(skills, counts) if not count],
+        }
+
+
+def get_role_fit_model():
+    global _model
+    snapshot = get_taxonomy()
+    model = _model
+    if model is None or model.version != snapshot.version:
+        model = _model = RoleFitModel(snapshot)
+    return model
+
+
+def team_role_gap(member_skills, role):
+    """Team-level gap of ``{member: skills}`` against ``role`` (``None`` for an unknown role)."""
+    return get_role_fit_model().team_gap(member_skills, role)
+
+
+def semantic_role_scores(resume_text):
+    """``{role: 0-100}`` similarity of the resume prose to each role description.
+
+    The resume is split into section-aware chunks that are embedded in one
+    batch; a role scores the mean cosine of its ``SEMANTIC_TOP_CHUNKS`` best
+    chunks. Returns ``None`` when no embedding model is available.
+    """
+    # imported lazily: skill-only callers never load the embedding stack
+    try:
+        from resume_parser import chunk_resume
+        from semantic_matcher import encode_chunks, load_role_embeddings
+    except ImportError as exc:
+        print("[role_fit] warning: semantic role fit unavailable:", exc)
+        return None
+
+    chunks = [f"{section}: {text}" for section, text in chunk_resume(resume_text)]
+    if not chunks:
+        return {}
+    roles = load_role_embeddings()
+    vectors = encode_chunks(chunks) if roles is not None else None
+    if vectors is None:
+        return None
+    names, matrix = roles
+    similarity = np.clip(vectors @ np.asarray(matrix).T, 0, None)
+    top = min(SEMANTIC_TOP_CHUNKS, len(chunks))
+    best = -np.sort(-similarity, axis=0)[:top]
+    return {role: float(score) * 100 for role, score in zip(names, best.mean(axis=0))}
+
+
+def rank_roles(user_skills, top_k=5, resume_text=None):
+    """Return the ``top_k`` best-fitting roles with their score, matched and missing skills.
+
+    With ``resume_text`` each role also gets a ``semantic_score`` (``None``
+    when no embedding model is available); the ranking stays skill-based.
+    """
+    semantic = None
+    if resume_text:
+        semantic = semantic_role_scores(resume_text) or {}
+    return get_role_fit_model().rank(user_skills, top_k=top_k, semantic_scores=semantic)
@@ -1,29 +1,433 @@
-from sentence_transformers import SentenceTransformer, util
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from taxonomy import BASE_DIR, get_taxonomy
+from encoder_backends import ENCODER_BACKEND, MODEL_NAME, load_encoder
+
+EMBEDDING_INDEX_DIR = os.environ.get("EMBEDDING_INDEX_DIR", os.path.join(BASE_DIR, "data", "embeddings"))
+USER_EMBEDDING_CACHE_SIZE = int(os.environ.get("USER_EMBEDDING_CACHE_SIZE", "4096"))
+CHUNK_EMBEDDING_CACHE_SIZE = int(os.environ.get("CHUNK_EMBEDDING_CACHE_SIZE", "8192"))
+EMBED_MAX_BATCH = int(os.environ.get("EMBED_MAX_BATCH", "64"))
+EMBED_MAX_WAIT_MS = float(os.environ.get("EMBED_MAX_WAIT_MS", "5"))
+# optional second opinion for the cheap "static" backend: job skills whose
+# score lands within RERANK_MARGIN of the threshold are re-scored by this backend
+RERANK_BACKEND = os.environ.get("SKILL_RERANK_BACKEND", "")
+RERANK_MARGIN = float(os.environ.get("SKILL_RERANK_MARGIN", "0.1"))
 
 # lazily-loaded transformer model; allows import to succeed in offline/no-network
 _model = None
+_model_attempted = False
+_model_lock = threading.Lock()
+_batcher = None
+_reranker = None
+_reranker_attempted = False
+# re-rank vectors come from another model, so they get their own LRU
+_rerank_cache = OrderedDict()
+_rerank_cache_lock = threading.Lock()
+
+# taxonomy embeddings (memory-mapped) and an LRU of free-text user skills
+_index = None
+_index_lock = threading.Lock()
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+# resume chunk embeddings keyed by content hash, and role-description embeddings
+_chunk_cache = OrderedDict()
+_chunk_cache_lock = threading.Lock()
+_role_embeddings = None
 
 
 def _get_model():
-    """Return a cached SentenceTransformer (loading on first call).
+    """Return the configured encoder backend (loading on first call).
 
     If the model is unavailable locally we fall back to a simpler matcher
     instead of blocking the UI trying to download at runtime.
     """
-    global _model
-    if _model is not None:
+    global _model, _model_attempted
+    if _model_attempted:
         return _model
-    try:
-        _model = SentenceTransformer("all-MiniLM-L6-v2", local_files_only=True)
-    except Exception as exc:
-        print("[semantic_matcher] warning: failed to load transformer model:", exc)
-        _model = None
+    with _model_lock:
+        # double-checked so concurrent first callers load the model exactly once
+        if not _model_attempted:
+            try:
+                _model = load_encoder()
+            except Exception as exc:
+                print("[semantic_matcher] warning: failed to load transformer model:", exc)
+                _model = None
+            _model_attempted = True
     return _model
 
 
-def semantic_skill_match(user_skills, job_skills):
+def _get_reranker():
+    """Batcher over the re-rank backend, so only its worker thread touches that model."""
+    global _reranker, _reranker_attempted
+    if _reranker_attempted or not RERANK_BACKEND or RERANK_BACKEND == ENCODER_BACKEND:
+        return _reranker
+    with _model_lock:
+        if not _reranker_attempted:
+            try:
+                _reranker = EmbeddingBatcher(load_encoder(RERANK_BACKEND).encode)
+            except Exception as exc:
+                print("[semantic_matcher] warning: failed to load re-rank model:", exc)
+                _reranker = None
+            _reranker_attempted = True
+    return _reranker
+
+
+def _encode_batch(texts):
     model = _get_model()
     if model is None:
+        return None
+    return model.encode(texts)
+
+
+# ---------- Cross-request micro-batching ----------
+class EmbeddingBatcher:
+    """Collects encode requests from concurrent callers into shared forward passes.
+
+    A single worker thread owns the model: it waits for the first request,
+    keeps gathering until ``max_batch_size`` strings or ``max_wait_ms`` have
+    accumulated, encodes the de-duplicated batch once and hands every caller
+    its own rows.
+    """
+
+    def __init__(self, encode_fn, max_batch_size=EMBED_MAX_BATCH, max_wait_ms=EMBED_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, texts):
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts):
+        return self.submit(texts).result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+            try:
+                vectors = self.encode_fn(unique) if unique else None
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            rows = {text: i for i, text in enumerate(unique)}
+            for texts, future in batch:
+                if vectors is None:
+                    future.set_result(None)
+                else:
+                    future.set_result(vectors[[rows[t] for t in texts]])
+
+
+def _get_batcher():
+    global _batcher
+    if _batcher is None:
+        with _model_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(_encode_batch)
+    return _batcher
+
+
+def _encode_with_model(texts):
+    texts = list(texts)
+    if not texts:
+        return None
+    return _get_batcher().encode(texts)
+
+
+# ---------- Taxonomy embedding index ----------
+class EmbeddingIndex:
+    """Normalized taxonomy embeddings (memory-mapped) with a string -> row map."""
+
+    def __init__(self, version, matrix, rows):
+        self.version = version
+        self.matrix = matrix
+        self.rows = rows
+
+
+def _index_paths(version):
+    # backends produce slightly different vectors, so each gets its own index
+    stem = os.path.join(EMBEDDING_INDEX_DIR, f"{MODEL_NAME}-{ENCODER_BACKEND}-{version}")
+    return stem + ".npy", stem + ".json"
+
+
+def build_embedding_index(snapshot=None):
+    """Encode every taxonomy skill and alias once and persist the matrix to disk."""
+    snapshot = snapshot or get_taxonomy()
+    texts = list(snapshot.skills)
+    for aliases in snapshot.skill_aliases.values():
+        texts.extend(aliases)
+    texts = list(dict.fromkeys(texts))
+
+    matrix = _encode_with_model(texts)
+    if matrix is None:
+        return None
+
+    matrix_path, rows_path = _index_paths(snapshot.version)
+    os.makedirs(EMBEDDING_INDEX_DIR, exist_ok=True)
+    tmp_suffix = f".{os.getpid()}.tmp"
+    with open(matrix_path + tmp_suffix, "wb") as fh:
+        np.save(fh, matrix)
+    with open(rows_path + tmp_suffix, "w", encoding="utf-8") as fh:
+        json.dump({text: row for row, text in enumerate(texts)}, fh)
+    # rows first: a reader that sees the matrix can always find its row map
+    os.replace(rows_path + tmp_suffix, rows_path)
+    os.replace(matrix_path + tmp_suffix, matrix_path)
+    return matrix_path
+
+
+def load_embedding_index(build=True):
+    """Return the taxonomy embedding index for the current snapshot.
+
+    The matrix is opened with ``mmap_mode="r"``, so processes share its pages.
+    With ``build=True`` a missing index is computed (this needs the model).
+    """
+    global _index
+    snapshot = get_taxonomy()
+    index = _index
+    if index is not None and index.version == snapshot.version:
+        return index
+
+    with _index_lock:
+        if _index is not None and _index.version == snapshot.version:
+            return _index
+        matrix_path, rows_path = _index_paths(snapshot.version)
+        if not os.path.exists(matrix_path):
+            if not build or build_embedding_index(snapshot) is None:
+                return None
+        with open(rows_path, "r", encoding="utf-8") as fh:
+            rows = json.load(fh)
+        _index = EmbeddingIndex(snapshot.version, np.load(matrix_path, mmap_mode="r"), rows)
+    return _index
+
+
+def _cache_get(text):
+    with _user_cache_lock:
+        vector = _user_cache.get(text)
+        if vector is not None:
+            _user_cache.move_to_end(text)
+        return vector
+
+
+def _cache_put(text, vector):
+    with _user_cache_lock:
+        _user_cache[text] = vector
+        _user_cache.move_to_end(text)
+        while len(_user_cache) > USER_EMBEDDING_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+
+
+def encode_skills(texts):
+    """Normalized embeddings for ``texts`` as an ``(n, dim)`` float32 array.
+
+    Taxonomy strings are read from the precomputed index and free text from
+    the LRU cache; only strings never seen before reach the model. Returns
+    ``None`` if some string needs the model and it is unavailable.
+    """
+    texts = [t.strip() for t in texts]
+    index = load_embedding_index()
+    vectors = [None] * len(texts)
+    misses = []
+    for i, text in enumerate(texts):
+        row = index.rows.get(text) if index is not None else None
+        if row is not None:
+            vectors[i] = index.matrix[row]
+            continue
+        cached = _cache_get(text)
+        if cached is not None:
+            vectors[i] = cached
+        else:
+            misses.append(i)
+
+    if misses:
+        unique = list(dict.fromkeys(texts[i] for i in misses))
+        encoded = _encode_with_model(unique)
+        if encoded is None:
+            return None
+        fresh = dict(zip(unique, encoded))
+        for text, vector in fresh.items():
+            _cache_put(text, vector)
+        for i in misses:
+            vectors[i] = fresh[texts[i]]
+
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack(vectors).astype(np.float32, copy=False)
+
+
+def _encode_rerank(reranker, texts):
+    """Re-rank embeddings for ``texts``, through an LRU like :func:`encode_skills`."""
+    texts = [t.strip() for t in texts]
+    with _rerank_cache_lock:
+        vectors = [_rerank_cache.get(text) for text in texts]
+        for text, vector in zip(texts, vectors):
+            if vector is not None:
+                _rerank_cache.move_to_end(text)
+
+    unique = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if unique:
+        fresh = dict(zip(unique, reranker.encode(unique)))
+        with _rerank_cache_lock:
+            for text, vector in fresh.items():
+                _rerank_cache[text] = vector
+            while len(_rerank_cache) > USER_EMBEDDING_CACHE_SIZE:
+                _rerank_cache.popitem(last=False)
+        vectors = [fresh[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+    return np.vstack(vectors).astype(np.float32, copy=False)
+
+
+def _rerank(user_skills, job_skills, scores, threshold):
+    """Re-score the job skills whose score is too close to ``threshold`` to trust."""
+    borderline = [i for i, score in enumerate(scores) if abs(score - threshold) <= RERANK_MARGIN]
+    if not borderline or not user_skills:
+        return scores
+    reranker = _get_reranker()
+    if reranker is None:
+        return scores
+    jobs = [job_skills[i] for i in borderline]
+    embeddings = _encode_rerank(reranker, jobs + list(user_skills))
+    similarity = (embeddings[:len(jobs)] @ embeddings[len(jobs):].T).max(axis=1)
+    scores = list(scores)
+    for i, score in zip(borderline, similarity):
+        scores[i] = float(score)
+    return scores
+
+
+def encode_chunks(chunks):
+    """Embeddings for resume text chunks, cached by the SHA-1 of each chunk.
+
+    All uncached chunks go to the model in one batch, so scoring the same
+    resume again (e.g. against another role) encodes nothing.
+    """
+    keys = [hashlib.sha1(chunk.encode("utf-8")).hexdigest() for chunk in chunks]
+    with _chunk_cache_lock:
+        vectors = [_chunk_cache.get(key) for key in keys]
+        for key, vector in zip(keys, vectors):
+            if vector is not None:
+                _chunk_cache.move_to_end(key)
+
+    misses = {}
+    for i, (key, vector) in enumerate(zip(keys, vectors)):
+        if vector is None:
+            misses.setdefault(key, chunks[i])
+    if misses:
+        encoded = _encode_with_model(list(misses.values()))
+        if encoded is None:
+            return None
+        fresh = dict(zip(misses, encoded))
+        with _chunk_cache_lock:
+            for key, vector in fresh.items():
+                _chunk_cache[key] = vector
+            while len(_chunk_cache) > CHUNK_EMBEDDING_CACHE_SIZE:
+                _chunk_cache.popitem(last=False)
+        vectors = [fresh.get(key) if vector is None else vector for key, vector in zip(keys, vectors)]
+
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack(vectors).astype(np.float32, copy=False)
+
+
+def role_description(role, skills):
+    return f"{role}. Key skills: {', '.join(skills)}."
+
+
+def load_role_embeddings(build=True):
+    """``(role_names, matrix)`` of role-description embeddings for the current snapshot.
+
+    Computed once per snapshot and stored next to the taxonomy index.
+    """
+    global _role_embeddings
+    snapshot = get_taxonomy()
+    cached = _role_embeddings
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1], cached[2]
+
+    with _index_lock:
+        if _role_embeddings is not None and _role_embeddings[0] == snapshot.version:
+            return _role_embeddings[1], _role_embeddings[2]
+        matrix_path = _index_paths(snapshot.version)[0][:-len(".npy")] + "-roles.npy"
+        roles = list(snapshot.role_names)
+        if os.path.exists(matrix_path):
+            matrix = np.load(matrix_path, mmap_mode="r")
+        elif build:
+            descriptions = [role_description(role, snapshot.role_skills(role)) for role in roles]
+            matrix = _encode_with_model(descriptions)
+            if matrix is None:
+                return None
+            os.makedirs(EMBEDDING_INDEX_DIR, exist_ok=True)
+            tmp_path = f"{matrix_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as fh:
+                np.save(fh, matrix)
+            os.replace(tmp_path, matrix_path)
+        else:
+            return None
+        _role_embeddings = (snapshot.version, roles, matrix)
+    return roles, matrix
+
+
+def semantic_skill_scores(user_skills, job_skills, threshold=0.7):
+    """Best cosine similarity of each job skill against the user skills.
+
+    Returns ``None`` when the transformer is unavailable so callers can
+    fall back to lexical matching. ``threshold`` only picks which scores
+    the optional re-rank backend double-checks.
+    """
+    if not user_skills or not job_skills:
+        return [0.0] * len(job_skills)
+
+    embeddings = encode_skills(list(job_skills) + list(user_skills))
+    if embeddings is None:
+        return None
+    # rows are L2-normalized, so the dot product is the cosine similarity
+    similarity = embeddings[:len(job_skills)] @ embeddings[len(job_skills):].T
+    scores = [float(score) for score in similarity.max(axis=1)]
+    if RERANK_BACKEND:
+        scores = _rerank(user_skills, list(job_skills), scores, threshold)
+    return scores
+
+
+def semantic_skill_match(user_skills, job_skills, threshold=0.7):
+    scores = semantic_skill_scores(user_skills, job_skills, threshold)
+    if scores is None:
         matched_skills = []
         lowered = [s.lower() for s in user_skills]
         for js in job_skills:
@@ -31,13 +435,4 @@ def semantic_skill_match(user_skills, job_skills):
                 matched_skills.append(js)
         return matched_skills
 
-    if not user_skills or not job_skills:
-        return []
-
-    # Batch embeddings + matrix cosine similarity for speed.
-    user_embeddings = model.encode(user_skills, convert_to_tensor=True)
-    job_embeddings = model.encode(job_skills, convert_to_tensor=True)
-    similarity = util.cos_sim(job_embeddings, user_embeddings)
-    best_scores = similarity.max(dim=1).values
-
-    return [js for js, score in zip(job_skills, best_scores) if score.item() > 0.7]
+    return [js for js, score in zip(job_skills, scores) if score > threshold]
@@ -0,0 +1,266 @@
+"""Approximate nearest-neighbour normalization against a large skill taxonomy.
+
+An inverted-file (IVF) index in pure NumPy: spherical k-means splits the
+taxonomy embeddings into ``nlist`` clusters, and a query is only compared
+with the members of its ``nprobe`` closest clusters. ``nprobe`` trades
+recall for latency; ``nprobe == nlist`` is an exact search.
+
+The external taxonomy is a local file (``SKILL_EXTERNAL_TAXONOMY``): one
+skill per line (.txt), a JSON list, or a CSV with a ``preferredLabel`` or
+``name`` column (ESCO / O*NET exports), falling back to the first column.
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+
+from taxonomy import BASE_DIR
+from encoder_backends import ENCODER_BACKEND, MODEL_NAME
+
+EXTERNAL_TAXONOMY_PATH = os.environ.get(
+    "SKILL_EXTERNAL_TAXONOMY", os.path.join(BASE_DIR, "data", "skills_external.txt")
+)
+ANN_INDEX_DIR = os.environ.get("SKILL_ANN_DIR", os.path.join(BASE_DIR, "data", "ann"))
+ANN_NPROBE = int(os.environ.get("SKILL_ANN_NPROBE", "16"))
+ANN_MIN_SCORE = float(os.environ.get("SKILL_ANN_MIN_SCORE", "0.7"))
+ENCODE_CHUNK = 512
+
+_index = None
+_index_stat = None
+_index_lock = threading.Lock()
+
+
+def load_external_skills(path=None):
+    path = path or EXTERNAL_TAXONOMY_PATH
+    with open(path, "r", encoding="utf-8", newline="") as fh:
+        if path.endswith(".json"):
+            skills = json.load(fh)
+        elif path.endswith(".csv"):
+            reader = csv.reader(fh)
+            header = next(reader, [])
+            column = next((header.index(c) for c in ("preferredLabel", "name") if c in header), 0)
+            skills = [row[column] for row in reader if len(row) > column]
+        else:
+            skills = fh.read().splitlines()
+    return list(dict.fromkeys(s.strip() for s in skills if s and s.strip()))
+
+
+def train_kmeans(vectors, nlist, iterations=10, sample_size=None, seed=0):
+    """Spherical k-means on L2-normalized rows; returns ``(nlist, dim)`` unit centroids."""
+    rng = np.random.default_rng(seed)
+    sample_size = sample_size or nlist * 256
+    if len(vectors) > sample_size:
+        vectors = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+    vectors = np.asarray(vectors, dtype=np.float32)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        counts = np.bincount(assign, minlength=nlist)
+        # re-seed empty clusters from random points
+        empty = np.nonzero(counts == 0)[0]
+        sums[empty] = vectors[rng.choice(len(vectors), len(empty))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.clip(norms, 1e-12, None)
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Vectors stored grouped by cluster: list ``c`` is rows ``offsets[c]:offsets[c + 1]``."""
+
+    def __init__(self, skills, vectors, centroids, offsets, version=None):
+        self.skills = skills
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.version = version
+
+    @property
+    def nlist(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, skills, vectors, nlist=None, iterations=10, version=None):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        nlist = nlist or max(1, min(int(np.sqrt(len(vectors)) * 2), len(vectors)))
+        centroids = train_kmeans(vectors, nlist, iterations)
+        assign = np.argmax(vectors @ centroids.T, axis=1) if len(vectors) else np.zeros(0, dtype=np.int64)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+        return cls([skills[i] for i in order], vectors[order], centroids, offsets, version)
+
+    def search(self, queries, k=5, nprobe=ANN_NPROBE):
+        """Top-``k`` ``(row, score)`` lists for each normalized query row."""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = max(1, min(nprobe, self.nlist))
+        coarse = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), coarse.shape)
+
+        # one matrix product per probed list, covering every query that probes it
+        hit_rows = [[] for _ in range(len(queries))]
+        hit_scores = [[] for _ in range(len(queries))]
+        for c in np.unique(probes):
+            lo, hi = self.offsets[c], self.offsets[c + 1]
+            if lo == hi:
+                continue
+            members = np.nonzero((probes == c).any(axis=1))[0]
+            scores = queries[members] @ np.asarray(self.vectors[lo:hi]).T
+            rows = np.arange(lo, hi)
+            for q, row_scores in zip(members, scores):
+                hit_rows[q].append(rows)
+                hit_scores[q].append(row_scores)
+
+        results = []
+        for rows, scores in zip(hit_rows, hit_scores):
+            if not rows:
+                results.append([])
+                continue
+            rows, scores = np.concatenate(rows), np.concatenate(scores)
+            top = min(k, len(rows))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            results.append([(int(rows[i]), float(scores[i])) for i in best])
+        return results
+
+    def save(self, directory):
+        tmp_dir = f"{directory}.{os.getpid()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "vectors.npy"), self.vectors)
+        np.save(os.path.join(tmp_dir, "centroids.npy"), self.centroids)
+        np.save(os.path.join(tmp_dir, "offsets.npy"), self.offsets)
+        with open(os.path.join(tmp_dir, "skills.json"), "w", encoding="utf-8") as fh:
+            json.dump({"version": self.version, "skills": self.skills}, fh, ensure_ascii=False)
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+        os.replace(tmp_dir, directory)
+        return directory
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, "skills.json"), "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        return cls(
+            meta["skills"],
+            np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r"),
+            np.load(os.path.join(directory, "centroids.npy")),
+            np.load(os.path.join(directory, "offsets.npy")),
+            meta["version"],
+        )
+
+
+def _file_version(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def _index_dir(version):
+    # vectors depend on the encoder, so each backend gets its own index
+    return os.path.join(ANN_INDEX_DIR, f"{MODEL_NAME}-{ENCODER_BACKEND}-{version}")
+
+
+def _encode(texts):
+    from semantic_matcher import _encode_with_model
+
+    chunks = []
+    for i in range(0, len(texts), ENCODE_CHUNK):
+        vectors = _encode_with_model(texts[i:i + ENCODE_CHUNK])
+        if vectors is None:
+            return None
+        chunks.append(vectors)
+    return np.vstack(chunks) if chunks else None
+
+
+def build_ann_index(path=None, nlist=None):
+    """Embed the external taxonomy and persist its IVF index (needs the model)."""
+    path = path or EXTERNAL_TAXONOMY_PATH
+    skills = load_external_skills(path)
+    vectors = _encode(skills)
+    if vectors is None:
+        return None
+    index = IVFIndex.build(skills, vectors, nlist, version=_file_version(path))
+    os.makedirs(ANN_INDEX_DIR, exist_ok=True)
+    index.save(_index_dir(index.version))
+    return index
+
+
+def get_ann_index(build=True):
+    """Return the IVF index for the external taxonomy file, or ``None`` if unavailable."""
+    global _index, _index_stat
+    try:
+        stat = os.stat(EXTERNAL_TAXONOMY_PATH)
+    except OSError:
+        return None
+    key = (stat.st_mtime_ns, stat.st_size)
+    index = _index
+    if index is not None and _index_stat == key:
+        return index
+    with _index_lock:
+        if _index is not None and _index_stat == key:
+            return _index
+        directory = _index_dir(_file_version(EXTERNAL_TAXONOMY_PATH))
+        if os.path.exists(os.path.join(directory, "skills.json")):
+            _index = IVFIndex.load(directory)
+        elif build:
+            _index = build_ann_index(EXTERNAL_TAXONOMY_PATH)
+        else:
+            return None
+        _index_stat = key if _index is not None else None
+    return _index
+
+
+def normalize_phrases(phrases, k=1, nprobe=ANN_NPROBE, min_score=ANN_MIN_SCORE):
+    """Map free-text phrases to their closest canonical skills.
+
+    Returns one list of ``(skill, score)`` pairs per phrase (best first,
+    at most ``k``, only scores of at least ``min_score``), or ``None`` when
+    the index or the model is unavailable.
+    """
+    # bypass encode_skills: one resume's fragments would flush its user-skill LRU
+    phrases = [phrase.strip() for phrase in phrases]
+    index = get_ann_index()
+    if index is None:
+        return None
+    if not phrases:
+        return []
+    queries = _encode(phrases)
+    if queries is None:
+        return None
+    return [
+        [(index.skills[row], score) for row, score in hits if score >= min_score]
+        for hits in index.search(queries, k, nprobe)
+    ]
+
+
+_PHRASE_SPLIT = re.compile(r"[,;:|\n•●▪/]+|\s[-–—]\s|\.\s")
+
+
+def candidate_phrases(text, max_words=4):
+    """Short comma/bullet/line separated fragments of ``text`` that may name a skill."""
+    phrases = []
+    for part in _PHRASE_SPLIT.split(text or ""):
+        part = part.strip(" \t:()[]\"'.")
+        if part and len(part.split()) <= max_words and any(ch.isalpha() for ch in part):
+            phrases.append(part)
+    return list(dict.fromkeys(phrases))
+
+
+def extract_normalized_skills(text, nprobe=ANN_NPROBE, min_score=ANN_MIN_SCORE):
+    """Canonical external-taxonomy skills for the skill-like phrases in ``text``."""
+    phrases = candidate_phrases(text)
+    results = normalize_phrases(phrases, 1, nprobe, min_score)
+    if results is None:
+        return []
+    return list(dict.fromkeys(hits[0][0] for hits in results if hits))
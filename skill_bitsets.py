@@ -0,0 +1,107 @@
+def normalize_skill(skill):
+    return skill.lower().strip()
+
+
+def lexical_match(a, b):
+    """The gap engine's lexical rule on normalized names: equal, substring or shared token."""
+    return a == b or a in b or b in a or bool(set(a.split()) & set(b.split()))
+
+
+def build_equivalence_table(skills):
+    """Return, for every skill, the ids of all skills that lexically match it."""
+    keys = [normalize_skill(s) for s in skills]
+    by_token = {}
+    for idx, key in enumerate(keys):
+        for token in set(key.split()):
+            by_token.setdefault(token, set()).add(idx)
+
+    table = []
+    for idx, key in enumerate(keys):
+        row = set()
+        for token in set(key.split()):
+            row |= by_token[token]
+        row.update(other for other, candidate in enumerate(keys) if key in candidate or candidate in key)
+        table.append(sorted(row))
+    return table
+
+
+class SkillBitsets:
+    """Skills interned to integer ids, with sets of skills held as int bitsets.
+
+    ``masks[i]`` has a bit set for every skill lexically equivalent to skill
+    ``i``, so a candidate's coverage is the OR of its skills' masks and a job
+    skill is matched when its bit is present in that coverage.
+    """
+
+    def __init__(self, skills, equiv_offsets, equiv_ids, free_text_cache_size=10000):
+        self.skills = skills
+        self.keys = [normalize_skill(s) for s in skills]
+        self.ids = {}
+        for idx, key in enumerate(self.keys):
+            self.ids.setdefault(key, idx)
+        self.masks = []
+        for idx in range(len(skills)):
+            mask = 0
+            for other in equiv_ids[equiv_offsets[idx]:equiv_offsets[idx + 1]]:
+                mask |= 1 << other
+            self.masks.append(mask)
+        self.free_text_cache_size = free_text_cache_size
+        self._free_text = {}
+
+    @staticmethod
+    def iter_ids(bits):
+        """Yield the skill ids whose bits are set in ``bits``."""
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def bitset(self, skills):
+        bits = 0
+        for skill in skills:
+            idx = self.ids.get(normalize_skill(skill))
+            if idx is not None:
+                bits |= 1 << idx
+        return bits
+
+    def _free_text_mask(self, key):
+        mask = self._free_text.get(key)
+        if mask is None:
+            mask = 0
+            for idx, other in enumerate(self.keys):
+                if lexical_match(key, other):
+                    mask |= 1 << idx
+            if len(self._free_text) >= self.free_text_cache_size:
+                self._free_text.clear()
+            self._free_text[key] = mask
+        return mask
+
+    def coverage(self, user_keys):
+        """OR of the equivalence masks of the (normalized) user skills."""
+        cover = 0
+        for key in user_keys:
+            idx = self.ids.get(key)
+            cover |= self.masks[idx] if idx is not None else self._free_text_mask(key)
+        return cover
+
+    def gap(self, user_skills, job_skills):
+        """Return ``(matched, missing, score)`` with analyze_skill_gap semantics."""
+        if not job_skills:
+            return [], [], 0
+
+        user_keys = {normalize_skill(s) for s in user_skills}
+        cover = self.coverage(user_keys)
+        matched = []
+        for js in job_skills:
+            j = normalize_skill(js)
+            idx = self.ids.get(j)
+            if idx is not None:
+                hit = (cover >> idx) & 1
+            else:
+                hit = any(lexical_match(j, u) for u in user_keys)
+            if hit:
+                matched.append(js)
+
+        missing = [skill for skill in job_skills if skill not in matched]
+        match_score = (len(matched) / len(job_skills)) * 100
+        return matched, missing, match_score
@@ -0,0 +1,384 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import deque
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+def _fold(ch):
+    # lower() may expand a few characters (e.g. "İ"); keep offsets 1:1 with the text.
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a skill taxonomy.
+
+    Transitions, failure links and outputs are stored as flat integer arrays
+    (CSR layout) so a single left-to-right pass over the text reports every
+    skill occurrence, independent of how many skills are in the taxonomy.
+    """
+
+    def __init__(self, skills, patterns, pattern_skill, edge_offsets, edge_chars,
+                 edge_targets, fail, out_offsets, out_patterns):
+        self.skills = skills
+        self.patterns = patterns
+        self.pattern_skill = pattern_skill
+        self.edge_offsets = edge_offsets
+        self.edge_chars = edge_chars
+        self.edge_targets = edge_targets
+        self.fail = fail
+        self.out_offsets = out_offsets
+        self.out_patterns = out_patterns
+        self._pattern_len = [len(p) for p in patterns]
+        self._needs_left = [_is_word_char(p[0]) for p in patterns]
+        self._needs_right = [_is_word_char(p[-1]) for p in patterns]
+        # lazily memoized DFA transitions, so hot paths skip the failure-link walk
+        self._delta = {}
+
+    def _step(self, state, code):
+        edge_offsets = self.edge_offsets
+        edge_chars = self.edge_chars
+        while True:
+            lo, hi = edge_offsets[state], edge_offsets[state + 1]
+            if lo != hi:
+                idx = bisect_left(edge_chars, code, lo, hi)
+                if idx < hi and edge_chars[idx] == code:
+                    return self.edge_targets[idx]
+            if state == 0:
+                return 0
+            state = self.fail[state]
+
+    def _scan(self, text):
+        matches = []
+        if not text:
+            return matches
+
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = "".join(_fold(ch) for ch in text)
+
+        out_offsets = self.out_offsets
+        out_patterns = self.out_patterns
+        delta = self._delta
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(folded):
+            key = (state << 21) | ord(ch)
+            nxt = delta.get(key)
+            if nxt is None:
+                nxt = delta[key] = self._step(state, ord(ch))
+            state = nxt
+            lo = out_offsets[state]
+            hi = out_offsets[state + 1]
+            for k in range(lo, hi):
+                p = out_patterns[k]
+                start = i - self._pattern_len[p] + 1
+                if self._needs_left[p] and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if self._needs_right[p] and i + 1 < n and _is_word_char(text[i + 1]):
+                    continue
+                matches.append((start, i + 1, self.pattern_skill[p]))
+
+        matches.sort()
+        return matches
+
+    def find_all(self, text):
+        """Return ``(start, end, skill)`` for every whole-word skill hit in ``text``."""
+        return [(start, end, self.skills[idx]) for start, end, idx in self._scan(text)]
+
+    def extract(self, text):
+        """Return the distinct skills found in ``text``, in taxonomy order."""
+        found = {idx for _, _, idx in self._scan(text)}
+        return [self.skills[i] for i in sorted(found)]
+
+
+def _expand_aliases(skills, aliases):
+    """Return the canonical skill list plus ``(surface form, skill index)`` pairs.
+
+    Alias targets missing from ``skills`` are appended so every alias hit
+    resolves to a canonical name.
+    """
+    skills = list(dict.fromkeys(skills))
+    for canonical in (aliases or {}):
+        if canonical not in skills:
+            skills.append(canonical)
+    index = {skill: idx for idx, skill in enumerate(skills)}
+    surfaces = [(skill, idx) for idx, skill in enumerate(skills)]
+    for canonical, names in (aliases or {}).items():
+        surfaces.extend((name, index[canonical]) for name in names)
+    return skills, surfaces
+
+
+def compile_skill_matcher(skills, aliases=None):
+    """Compile skill names (and optional ``{canonical: [aliases]}``) into a :class:`SkillMatcher`."""
+    skills, surfaces = _expand_aliases(skills, aliases)
+    patterns = []
+    pattern_skill = []
+    seen = set()
+    for surface, idx in surfaces:
+        pattern = "".join(_fold(ch) for ch in surface.strip())
+        if not pattern or pattern in seen:
+            continue
+        seen.add(pattern)
+        patterns.append(pattern)
+        pattern_skill.append(idx)
+
+    # Build the trie with dicts, then flatten breadth-first.
+    goto = [{}]
+    terminal = [[]]
+    for p_idx, pattern in enumerate(patterns):
+        state = 0
+        for ch in pattern:
+            code = ord(ch)
+            nxt = goto[state].get(code)
+            if nxt is None:
+                nxt = len(goto)
+                goto[state][code] = nxt
+                goto.append({})
+                terminal.append([])
+            state = nxt
+        terminal[state].append(p_idx)
+
+    fail = [0] * len(goto)
+    outputs = [list(t) for t in terminal]
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for code, nxt in goto[state].items():
+            queue.append(nxt)
+            f = fail[state]
+            while f and code not in goto[f]:
+                f = fail[f]
+            target = goto[f].get(code, 0)
+            fail[nxt] = target if target != nxt else 0
+            outputs[nxt].extend(outputs[fail[nxt]])
+
+    edge_offsets = array("I", [0])
+    edge_chars = array("I")
+    edge_targets = array("I")
+    out_offsets = array("I", [0])
+    out_patterns = array("I")
+    for state, edges in enumerate(goto):
+        for code in sorted(edges):
+            edge_chars.append(code)
+            edge_targets.append(edges[code])
+        edge_offsets.append(len(edge_chars))
+        out_patterns.extend(outputs[state])
+        out_offsets.append(len(out_patterns))
+
+    return SkillMatcher(
+        skills,
+        patterns,
+        array("I", pattern_skill),
+        edge_offsets,
+        edge_chars,
+        edge_targets,
+        array("I", fail),
+        out_offsets,
+        out_patterns,
+    )
+
+
+# ---------- Fuzzy (typo-tolerant) matching ----------
+
+FUZZY_PREFIX_LENGTH = 7
+_TOKEN_PATTERN = re.compile(r"[^\W_][\w+#.]*")
+_SQUASH_PATTERN = re.compile(r"[^\w+#]|_")
+
+
+def _squash(text):
+    """Normalize a phrase for fuzzy lookup: lowercase, drop spaces and separators."""
+    return _SQUASH_PATTERN.sub("", text.lower())
+
+
+def _max_edits(length):
+    # short names ("Go", "React", "Scala") collide with ordinary words too easily
+    if length <= 5:
+        return 0
+    if length <= 9:
+        return 1
+    return 2
+
+
+def _deletes(word, max_edits):
+    results = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        results |= nxt
+        frontier = nxt
+    return results
+
+
+def _edit_distance(a, b, limit):
+    """Optimal-string-alignment distance, or ``limit + 1`` once it is exceeded."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            val = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                val = min(val, prev2[j - 2] + 1)
+            cur[j] = val
+            row_min = min(row_min, val)
+        if row_min > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class FuzzySkillIndex:
+    """SymSpell-style deletion index over a skill taxonomy.
+
+    Every skill is squashed ("Tensor Flow" -> "tensorflow") and the deletions
+    of its prefix are precomputed, so a lookup only generates the deletions of
+    the query and verifies the few candidates that share one.
+    """
+
+    def __init__(self, skills, aliases=None, prefix_length=FUZZY_PREFIX_LENGTH, cache_size=50000):
+        self.skills, surfaces = _expand_aliases(skills, aliases)
+        self.prefix_length = prefix_length
+        self.keys = [_squash(surface) for surface, _ in surfaces]
+        self.key_skill = [idx for _, idx in surfaces]
+        self.key_limits = [_max_edits(len(key)) for key in self.keys]
+        self.exact = {}
+        self.deletes = {}
+        for k_idx, key in enumerate(self.keys):
+            if not key:
+                continue
+            self.exact.setdefault(key, k_idx)
+            for d in _deletes(key[:prefix_length], _max_edits(len(key))):
+                self.deletes.setdefault(d, []).append(k_idx)
+        lengths = [len(k) for k in self.keys if k]
+        self.min_len = max(min(lengths) - 2, 1) if lengths else 1
+        self.max_len = max(lengths) + 2 if lengths else 0
+        self.max_words = max((len(surface.split()) for surface, _ in surfaces), default=1) + 1
+        self.cache_size = cache_size
+        self._cache = {}
+        self._candidates = {}
+        self._reach = {}
+
+    def lookup(self, phrase):
+        """Return the index of the closest skill within its edit budget, or ``None``."""
+        return self._lookup_key(_squash(phrase))
+
+    def _lookup_key(self, key):
+        cached = self._cache.get(key, -1)
+        if cached != -1:
+            return cached
+        if not (self.min_len <= len(key) <= self.max_len):
+            return None
+
+        best = self.exact.get(key)
+        if best is None:
+            best_dist = None
+            for k_idx in self._prefix_candidates(key[:self.prefix_length], _max_edits(len(key))):
+                target = self.keys[k_idx]
+                limit = self.key_limits[k_idx]
+                if abs(len(target) - len(key)) > limit:
+                    continue
+                dist = _edit_distance(key, target, limit)
+                if dist <= limit and (best_dist is None or dist < best_dist):
+                    best, best_dist = k_idx, dist
+        if best is not None:
+            best = self.key_skill[best]
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[key] = best
+        return best
+
+    def _prefix_candidates(self, prefix, max_edits):
+        # every window at least as long as the prefix shares it, so resolve it once
+        found = self._candidates.get((prefix, max_edits))
+        if found is None:
+            found = sorted({
+                k_idx
+                for d in _deletes(prefix, max_edits)
+                for k_idx in self.deletes.get(d, ())
+                if self.keys[k_idx][0] == prefix[0]
+            })
+            if len(self._candidates) >= self.cache_size:
+                self._candidates.clear()
+            self._candidates[(prefix, max_edits)] = found
+        return found
+
+    def _prefix_reach(self, prefix):
+        """Longest query length that can still match a key sharing ``prefix``."""
+        longest = max(
+            (len(self.keys[k]) + self.key_limits[k] for k in self._prefix_candidates(prefix, 2)),
+            default=0,
+        )
+        if len(self._reach) >= self.cache_size:
+            self._reach.clear()
+        self._reach[prefix] = longest
+        return longest
+
+    def _scan(self, tokens):
+        """Return ``(first, last, skill index)`` token positions of every matching window."""
+        parts = []
+        for token in tokens:
+            part = token.lower()
+            if not part.isalnum():
+                part = _squash(part)
+            parts.append(part)
+
+        # hot loop: almost every window is a cache hit, so skip the method call for those.
+        # Once a window covers the indexed prefix every longer window shares it, so the
+        # run stops as soon as no key reachable from that prefix is long enough.
+        cache, lookup, max_len = self._cache, self._lookup_key, self.max_len
+        prefix_length, reach = self.prefix_length, self._reach
+        matches = []
+        for i in range(len(parts)):
+            key = ""
+            for j in range(i, min(i + self.max_words, len(parts))):
+                key += parts[j]
+                if len(key) > max_len:
+                    break
+                idx = cache.get(key, -1)
+                if idx == -1:
+                    idx = lookup(key)
+                if idx is not None:
+                    matches.append((i, j, idx))
+                if len(key) >= prefix_length:
+                    longest = reach.get(key[:prefix_length])
+                    if longest is None:
+                        longest = self._prefix_reach(key[:prefix_length])
+                    if len(key) >= longest:
+                        break
+        return matches
+
+    def find_all(self, text):
+        """Return ``(start, end, skill)`` for fuzzy hits over 1..n-word windows of ``text``."""
+        spans = []
+        for m in _TOKEN_PATTERN.finditer(text or ""):
+            token = m.group().rstrip(".")
+            spans.append((m.start(), m.start() + len(token), token))
+        return [
+            (spans[i][0], spans[j][1], self.skills[idx])
+            for i, j, idx in self._scan([token for _, _, token in spans])
+        ]
+
+    def extract(self, text):
+        # offsets are only needed by find_all, so tokenize without match objects
+        found = {idx for _, _, idx in self._scan(_TOKEN_PATTERN.findall(text or ""))}
+        return [self.skills[i] for i in sorted(found)]
+
+
+def build_fuzzy_index(skills, aliases=None):
+    """Build a :class:`FuzzySkillIndex` over the given skill names and aliases."""
+    return FuzzySkillIndex(skills, aliases)
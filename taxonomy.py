@@ -0,0 +1,293 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+
+from skill_matcher import SkillMatcher, compile_skill_matcher, build_fuzzy_index
+from skill_bitsets import SkillBitsets, build_equivalence_table
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TAXONOMY_PATH = os.environ.get("TAXONOMY_PATH", os.path.join(BASE_DIR, "data", "taxonomy.json"))
+SNAPSHOT_DIR = os.environ.get("TAXONOMY_SNAPSHOT_DIR", os.path.join(BASE_DIR, "data", "snapshots"))
+RELOAD_INTERVAL = float(os.environ.get("TAXONOMY_RELOAD_INTERVAL", "2.0"))
+
+# Snapshot layout: header, section table, then 8-byte aligned sections. "meta"
+# is UTF-8 JSON (string tables); every other section is a native uint32 array
+# that is used straight out of the memory map.
+SNAPSHOT_MAGIC = b"OGTAXSNP"
+SNAPSHOT_FORMAT = 2
+_HEADER = struct.Struct("<8sII32s")
+_SECTION = struct.Struct("<16sQQ")
+_ARRAY_SECTIONS = (
+    "role_offsets",
+    "role_skill_ids",
+    "pattern_skill",
+    "edge_offsets",
+    "edge_chars",
+    "edge_targets",
+    "fail",
+    "out_offsets",
+    "out_patterns",
+    "equiv_offsets",
+    "equiv_ids",
+)
+
+
+def load_taxonomy_source(path=None):
+    """Read the editable taxonomy file into plain Python structures."""
+    with open(path or TAXONOMY_PATH, "r", encoding="utf-8") as fh:
+        raw = json.load(fh)
+    categories = raw.get("skill_database", {})
+    if isinstance(categories, dict):
+        skill_database = [skill for skills in categories.values() for skill in skills]
+    else:
+        skill_database = list(categories)
+    return {
+        "skill_database": skill_database,
+        "skill_aliases": raw.get("skill_aliases", {}),
+        "job_roles": raw.get("job_roles", {}),
+        "salary_data": raw.get("salary_data", {}),
+    }
+
+
+def taxonomy_version(path=None):
+    with open(path or TAXONOMY_PATH, "rb") as fh:
+        digest = hashlib.sha256(b"%d:" % SNAPSHOT_FORMAT + fh.read()).hexdigest()
+    return digest[:32]
+
+
+def _encode_sections(source, version):
+    matcher = compile_skill_matcher(source["skill_database"], source["skill_aliases"])
+    skills = list(matcher.skills)
+    ids = {skill: idx for idx, skill in enumerate(skills)}
+
+    role_names = list(source["job_roles"])
+    role_offsets = array("I", [0])
+    role_skill_ids = array("I")
+    for role in role_names:
+        for skill in source["job_roles"][role]:
+            if skill not in ids:
+                ids[skill] = len(skills)
+                skills.append(skill)
+            role_skill_ids.append(ids[skill])
+        role_offsets.append(len(role_skill_ids))
+
+    equiv_offsets = array("I", [0])
+    equiv_ids = array("I")
+    for row in build_equivalence_table(skills):
+        equiv_ids.extend(row)
+        equiv_offsets.append(len(equiv_ids))
+
+    meta = {
+        "version": version,
+        "byteorder": sys.byteorder,
+        "skills": skills,
+        "skill_database": source["skill_database"],
+        "skill_aliases": source["skill_aliases"],
+        "roles": role_names,
+        "salary_data": source["salary_data"],
+        "patterns": matcher.patterns,
+    }
+    sections = {"meta": json.dumps(meta, ensure_ascii=False).encode("utf-8")}
+    tables = {
+        "role_offsets": role_offsets,
+        "role_skill_ids": role_skill_ids,
+        "pattern_skill": matcher.pattern_skill,
+        "edge_offsets": matcher.edge_offsets,
+        "edge_chars": matcher.edge_chars,
+        "edge_targets": matcher.edge_targets,
+        "fail": matcher.fail,
+        "out_offsets": matcher.out_offsets,
+        "out_patterns": matcher.out_patterns,
+        "equiv_offsets": equiv_offsets,
+        "equiv_ids": equiv_ids,
+    }
+    for name in _ARRAY_SECTIONS:
+        sections[name] = array("I", tables[name]).tobytes()
+    return sections
+
+
+def write_snapshot(source, version, path):
+    """Serialize a compiled taxonomy to ``path`` (atomically, via rename)."""
+    sections = _encode_sections(source, version)
+    offset = _HEADER.size + _SECTION.size * len(sections)
+    table = []
+    payload = []
+    for name, data in sections.items():
+        offset += -offset % 8
+        table.append(_SECTION.pack(name.encode("ascii"), offset, len(data)))
+        payload.append((offset, data))
+        offset += len(data)
+
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, len(sections), version.encode("ascii")))
+        fh.write(b"".join(table))
+        for section_offset, data in payload:
+            fh.write(b"\0" * (section_offset - fh.tell()))
+            fh.write(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_snapshot(source_path=None, snapshot_dir=None):
+    """Compile ``source_path`` unless a snapshot for its content already exists."""
+    source_path = source_path or TAXONOMY_PATH
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    version = taxonomy_version(source_path)
+    path = os.path.join(snapshot_dir, f"taxonomy-{version}.bin")
+    if not os.path.exists(path):
+        os.makedirs(snapshot_dir, exist_ok=True)
+        write_snapshot(load_taxonomy_source(source_path), version, path)
+    return path
+
+
+def prune_snapshots(keep, snapshot_dir=None):
+    """Delete compiled snapshots other than ``keep`` (mapped copies stay readable on POSIX)."""
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    keep = os.path.basename(keep)
+    for name in os.listdir(snapshot_dir):
+        if name.startswith("taxonomy-") and name.endswith(".bin") and name != keep:
+            try:
+                os.remove(os.path.join(snapshot_dir, name))
+            except OSError as exc:
+                print("[taxonomy] warning: could not remove stale snapshot:", exc)
+
+
+class TaxonomySnapshot:
+    """Read-only, memory-mapped view of a compiled taxonomy.
+
+    Workers that map the same file share its pages; only the string tables
+    in ``meta`` are materialized as Python objects.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        magic, fmt, count, version = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a format {SNAPSHOT_FORMAT} taxonomy snapshot")
+
+        sections = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            sections[name.rstrip(b"\0").decode("ascii")] = view[offset:offset + length]
+
+        meta = json.loads(bytes(sections["meta"]).decode("utf-8"))
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was compiled on a {meta['byteorder']}-endian host")
+
+        self.version = version.decode("ascii")
+        self.skills = meta["skills"]
+        self.skill_database = meta["skill_database"]
+        self.skill_aliases = meta["skill_aliases"]
+        self.role_names = meta["roles"]
+        self.salary_data = meta["salary_data"]
+        self.tables = {name: sections[name].cast("I") for name in _ARRAY_SECTIONS}
+        self.skill_ids = {skill: idx for idx, skill in enumerate(self.skills)}
+        self._role_index = {role.lower(): idx for idx, role in enumerate(self.role_names)}
+
+        t = self.tables
+        self.matcher = SkillMatcher(
+            self.skills,
+            meta["patterns"],
+            t["pattern_skill"],
+            t["edge_offsets"],
+            t["edge_chars"],
+            t["edge_targets"],
+            t["fail"],
+            t["out_offsets"],
+            t["out_patterns"],
+        )
+        self.bitsets = SkillBitsets(self.skills, t["equiv_offsets"], t["equiv_ids"])
+        self._fuzzy_index = None
+        self._job_roles = None
+
+    def skill_id(self, skill):
+        return self.skill_ids.get(skill)
+
+    def role_skill_ids(self, role):
+        idx = self._role_index.get((role or "").lower())
+        if idx is None:
+            return []
+        offsets = self.tables["role_offsets"]
+        return self.tables["role_skill_ids"][offsets[idx]:offsets[idx + 1]]
+
+    def role_skills(self, role):
+        return [self.skills[i] for i in self.role_skill_ids(role)]
+
+    @property
+    def job_roles(self):
+        if self._job_roles is None:
+            self._job_roles = {role: self.role_skills(role) for role in self.role_names}
+        return self._job_roles
+
+    @property
+    def fuzzy_index(self):
+        # dict-based, so it is built per process on first use
+        if self._fuzzy_index is None:
+            self._fuzzy_index = build_fuzzy_index(self.skills, self.skill_aliases)
+        return self._fuzzy_index
+
+
+# ---------- Process-wide current snapshot ----------
+
+_lock = threading.Lock()
+_current = None
+_current_mtime = None
+_watcher = None
+
+
+def reload_taxonomy(force=False):
+    """Swap in a fresh snapshot if the taxonomy file changed on disk.
+
+    The swap is a single reference assignment: requests that already hold
+    the previous snapshot keep using it until they finish.
+    """
+    global _current, _current_mtime
+    mtime = os.stat(TAXONOMY_PATH).st_mtime_ns
+    if not force and _current is not None and mtime == _current_mtime:
+        return _current
+    with _lock:
+        if not force and _current is not None and mtime == _current_mtime:
+            return _current
+        snapshot = TaxonomySnapshot(build_snapshot())
+        if _current is not None and snapshot.version != _current.version:
+            print(f"[taxonomy] loaded snapshot {snapshot.version}")
+        _current, _current_mtime = snapshot, mtime
+        prune_snapshots(snapshot.path)
+    return _current
+
+
+def _watch():
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        try:
+            reload_taxonomy()
+        except Exception as exc:
+            print("[taxonomy] warning: keeping previous snapshot:", exc)
+
+
+def start_taxonomy_watcher():
+    global _watcher
+    with _lock:
+        if _watcher is None and RELOAD_INTERVAL > 0:
+            _watcher = threading.Thread(target=_watch, name="taxonomy-watcher", daemon=True)
+            _watcher.start()
+
+
+def get_taxonomy():
+    """Return the current :class:`TaxonomySnapshot`, loading it on first use."""
+    snapshot = _current
+    if snapshot is None:
+        snapshot = reload_taxonomy()
+        start_taxonomy_watcher()
+    return snapshot
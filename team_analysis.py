@@ -0,0 +1,48 @@
+from taxonomy import get_taxonomy
+from role_fit import team_role_gap
+from github_analyzer import analyze_github_team_async, run_sync
+
+
+def github_skills(profile):
+    """Taxonomy skills evidenced by a GitHub profile's languages."""
+    if not profile:
+        return []
+    languages = set(profile.get("languages", {})) | set(profile.get("language_bytes", {}))
+    return get_taxonomy().matcher.extract(", ".join(sorted(languages)))
+
+
+async def analyze_team_async(org=None, usernames=None, role=None, deep=False, member_skills=None):
+    """GitHub fan-out for a team plus per-member and aggregate skill coverage.
+
+    ``member_skills`` optionally adds known skills (e.g. from resumes) per
+    login. With ``role`` the team gap is computed in one vectorized pass.
+    Returns ``None`` if ``org`` cannot be read.
+    """
+    team = await analyze_github_team_async(org, usernames, deep)
+    if team is None:
+        return None
+    member_skills = member_skills or {}
+
+    members = []
+    skills_by_member = {}
+    skill_coverage = {}
+    for login, profile in team["members"].items():
+        skills = list(dict.fromkeys(github_skills(profile) + list(member_skills.get(login, []))))
+        skills_by_member[login] = skills
+        for skill in skills:
+            skill_coverage[skill] = skill_coverage.get(skill, 0) + 1
+        members.append({"username": login, "github": profile, "skills": skills})
+
+    aggregate = dict(team["aggregate"])
+    aggregate["skill_coverage"] = dict(sorted(skill_coverage.items(), key=lambda item: -item[1]))
+    return {
+        "org": org,
+        "members": members,
+        "aggregate": aggregate,
+        "gap": team_role_gap(skills_by_member, role) if role else None,
+    }
+
+
+def analyze_team(org=None, usernames=None, role=None, deep=False, member_skills=None):
+    """Blocking wrapper around :func:`analyze_team_async`."""
+    return run_sync(analyze_team_async(org, usernames, role, deep, member_skills))
@@ -1,41 +1,15 @@
-from job_roles_data import job_roles
+from taxonomy import get_taxonomy, load_taxonomy_source
 
 def get_skills_for_role(role):
-    for job_role in job_roles:
-        if job_role.lower() == role.lower():
-            return job_roles[job_role]
-    return []
-
-
-SKILL_DATABASE = [
-    # Programming Languages
-    "Python", "Java", "C++", "C#", "JavaScript", "TypeScript", "Ruby", "PHP", "Swift", "Kotlin", "Go", "Rust", "R", "Scala", "Dart",
-    
-    # Data Science & AI
-    "Machine Learning", "Deep Learning", "Data Science", "Statistics", "Pandas", "NumPy", "Scikit-learn", "Keras",
-    "TensorFlow", "PyTorch", "NLP", "Computer Vision", "OpenCV", "Reinforcement Learning", "Generative AI", "LLM",
-    "Matplotlib", "Seaborn", "Plotly", "Tableau", "Power BI", "Excel", "Data Visualization",
-
-    # Web Development
-    "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Express", "Django", "Flask", "FastAPI", "Spring Boot", 
-    "ASP.NET", "Ruby on Rails", "Laravel", "Tailwind CSS", "Bootstrap", "SASS", "GraphQL", "REST APIs",
-    
-    # Database
-    "SQL", "MySQL", "PostgreSQL", "MongoDB", "NoSQL", "Redis", "Cassandra", "Oracle", "SQLite", "Firebase",
-
-    # DevOps & Cloud
-    "Git", "GitHub", "GitLab", "Docker", "Kubernetes", "Jenkins", "Travis CI", "CircleCI", "Ansible", "Terraform",
-    "AWS", "Azure", "Google Cloud", "Linux", "Unix", "Bash", "Shell Scripting", "Nginx", "Apache",
-
-    # Mobile Development
-    "Android", "iOS", "Flutter", "React Native", "SwiftUI", "Jetpack Compose",
-    
-    # Cybersecurity
-    "Network Security", "Penetration Testing", "Ethical Hacking", "Cryptography", "Firewalls", "Wireshark", "Metasploit", "SIEM",
-    
-    # Other
-    "Agile", "Scrum", "JIRA", "Trello", "Slack", "Communication", "Leadership", "Problem Solving", "Critical Thinking"
-]
+    return get_taxonomy().role_skills(role)
+
+
+_taxonomy_source = load_taxonomy_source()
+
+# Flat skill list and {canonical: [aliases]} table from data/taxonomy.json.
+SKILL_DATABASE = _taxonomy_source["skill_database"]
+SKILL_ALIASES = _taxonomy_source["skill_aliases"]
+
 
 def calculate_github_score(github_data):
     if not github_data:
@@ -49,7 +23,12 @@ def calculate_github_score(github_data):
     # Stars contribution
     score += min(github_data["total_stars"] * 2, 30)
 
-    # Language diversity
-    score += min(len(github_data["languages"]) * 5, 30)
+    # Language diversity; with byte shares, only languages that are at least
+    # 5% of the code count, so a stray config file is not a second language
+    shares = github_data.get("language_shares")
+    if shares:
+        score += min(sum(1 for share in shares.values() if share >= 0.05) * 5, 30)
+    else:
+        score += min(len(github_data["languages"]) * 5, 30)
 
     return min(score, 100)